@@ -0,0 +1,168 @@
+# bench.py
+# Hot-path benchmarks that run anywhere: fake spidev/GPIO (fakehw.py) + SDL dummy video.
+#
+#   python bench.py                                   # default matrix, JSON to stdout
+#   python bench.py --pop 55 500 --size 128 256 --teams 2 4 --out bench.json
+#
+# Every parameter combination runs in its own interpreter because config values are
+# bound at import time (`from config import *`). Output is one JSON document:
+#   {"meta": {...}, "cases": [{"params": {...}, "results": {name: stats}}]}
+# with stats in microseconds (n, mean, p50, p95, max).
+import argparse, itertools, json, os, platform, subprocess, sys, time
+
+# ----------------- child side -----------------
+def _apply_params(p):
+    import config as C
+    for k, v in p.items():
+        setattr(C, k, v)
+    if "WIDTH" in p or "HEIGHT" in p:
+        C.FORAGE_WAYPOINT_DIST = int(min(C.WIDTH, C.HEIGHT) * 0.35)
+    C.TEAM_COLORS = C.team_colors(C.NUM_TEAMS)
+    C.ROLE_WEIGHTS = [[5,2,2,1] for _ in range(C.NUM_TEAMS)]
+    C.SIM = False; C.DISPLAY_PROCESS = False; C.SOA_UNITS = False
+
+def _stats(ns):
+    if not ns: return {"n": 0}
+    s = sorted(ns)
+    pick = lambda q: s[min(len(s)-1, int(q*len(s)))] / 1e3
+    return {"n": len(s), "mean": sum(s)/len(s)/1e3, "p50": pick(0.50), "p95": pick(0.95), "max": s[-1]/1e3}
+
+def _run_case(params, ticks, rounds, seed):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    _apply_params(params)
+    import fakehw; fakehw.install()
+    import numpy as np, pygame
+    import config as C
+    import meta
+    from entities import Building
+    from world import World
+    from lcd_backend_pi import LCDPi
+    import lcd_present
+    import main as M
+
+    clock = time.perf_counter_ns
+    acc = {}
+    def rec(name, dt): acc.setdefault(name, []).append(dt)
+
+    class TimedWorld(World):
+        def update_buildings(self):
+            t_loop = clock()
+            for b in list(self.buildings):
+                t0 = clock()
+                b.update(self.units, self.buildings, self.foods)
+                rec(f"Building.update[{b.btype}]", clock() - t0)
+            rec("building_loop", clock() - t_loop)
+
+        def update_units(self):
+            units = self.units
+            alive = []
+            for u in units:
+                t0 = clock()
+                ok = u.update(self.foods, self.resources, self.buildings, units)
+                rec(f"Unit.update[{u.role}]", clock() - t0)
+                if ok: alive.append(u)
+                units.moved(u)
+            units.replace(alive)
+
+        def step(self):
+            t0 = clock()
+            ended = super().step()
+            rec("tick", clock() - t0)
+            return ended
+
+    world = TimedWorld(meta_state=meta._default(), autosave=False, learn=False, seed=seed)
+    world.spawn_initial_world()
+    # make sure every building type that has per-tick work is present
+    for t in range(C.NUM_TEAMS):
+        home = world.home_of(t)
+        side = 1 if home.x < C.WIDTH / 2 else -1
+        world.buildings.append(Building(home.x + side*20, home.y - 10, t, "tower", rng=world.rng,
+                                         combat=world.combat))
+        world.buildings.append(Building(home.x + side*20, home.y + 10, t, "farm",  rng=world.rng,
+                                         combat=world.combat))
+
+    screen = lcd_present.surface()
+    for _ in range(ticks):
+        world.step()
+        t0 = clock(); M.draw_world(world, screen); rec("draw_world", clock() - t0)
+        t0 = clock(); lcd_present.present();            rec("present", clock() - t0)
+
+    img = np.random.default_rng(seed).integers(0, 256, (C.PANEL_H, C.PANEL_W, 3), dtype=np.uint8)
+    for _ in range(200):
+        t0 = clock(); LCDPi.rgb_to_bgr565_bytes(img); rec("LCDPi.rgb_to_bgr565_bytes", clock() - t0)
+
+    round_ticks = []
+    for r in range(rounds):
+        w = World(meta_state=meta._default(), autosave=False, learn=False, seed=seed + 1 + r)
+        w.spawn_initial_world()
+        t0 = clock()
+        while not w.step():
+            pass
+        rec("round", clock() - t0)
+        round_ticks.append(w.last_round_ticks)
+
+    results = {k: _stats(v) for k, v in sorted(acc.items())}
+    results["round"]["ticks"] = round_ticks
+    spi, gpio = lcd_present._lcd.spi, sys.modules["RPi.GPIO"]
+    results["spi"] = {"bytes_per_frame": spi.bytes_written / max(1, ticks), "writes": spi.writes,
+                      "gpio_writes": gpio.outputs,
+                      "bus_ms_per_frame": spi.bus_seconds() * 1e3 / max(1, ticks)}
+    return results
+
+# ----------------- parent side -----------------
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except Exception:
+        return None
+
+def main():
+    ap = argparse.ArgumentParser(description="Ant colony hot-path benchmarks (JSON output)")
+    ap.add_argument("--pop",       type=int, nargs="+", default=[55, 300], help="MAX_TEAM_POP values")
+    ap.add_argument("--food",      type=int, nargs="+", default=[40, 200], help="MAX_FOOD values")
+    ap.add_argument("--resources", type=int, nargs="+", default=None, help="MAX_RESOURCES (default: 5/4 of food)")
+    ap.add_argument("--size",      type=int, nargs="+", default=[128], help="square world sizes (WIDTH=HEIGHT)")
+    ap.add_argument("--teams",     type=int, nargs="+", default=[2], help="NUM_TEAMS values")
+    ap.add_argument("--ticks",  type=int, default=600, help="timed ticks (with draw + present) per case")
+    ap.add_argument("--rounds", type=int, default=1, help="whole headless rounds per case")
+    ap.add_argument("--seed",   type=int, default=1)
+    ap.add_argument("--out", default=None, help="write JSON here instead of stdout")
+    ap.add_argument("--case", default=None, help=argparse.SUPPRESS)   # child mode
+    args = ap.parse_args()
+
+    if args.case is not None:
+        res = _run_case(json.loads(args.case), args.ticks, args.rounds, args.seed)
+        print(json.dumps(res))
+        return
+
+    res_list = args.resources or [None]
+    cases = []
+    for pop, food, res, size, teams in itertools.product(args.pop, args.food, res_list, args.size, args.teams):
+        params = {"MAX_TEAM_POP": pop, "MAX_FOOD": food,
+                  "MAX_RESOURCES": res if res is not None else food * 5 // 4,
+                  "WIDTH": size, "HEIGHT": size, "NUM_TEAMS": teams}
+        cmd = [sys.executable, os.path.abspath(__file__), "--case", json.dumps(params),
+               "--ticks", str(args.ticks), "--rounds", str(args.rounds), "--seed", str(args.seed)]
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1", SDL_VIDEODRIVER="dummy")
+        print(f"[bench] {params}", file=sys.stderr)
+        p = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        if p.returncode != 0:
+            cases.append({"params": params, "error": p.stderr.strip().splitlines()[-1:]})
+            continue
+        cases.append({"params": params, "results": json.loads(p.stdout.strip().splitlines()[-1])})
+
+    doc = {
+        "meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": _git_rev(),
+                 "python": platform.python_version(), "machine": platform.machine(),
+                 "ticks": args.ticks, "rounds": args.rounds, "seed": args.seed, "units": "us"},
+        "cases": cases,
+    }
+    text = json.dumps(doc, indent=1)
+    if args.out:
+        with open(args.out, "w") as f: f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# camera.py
+# Which part of the world ends up on the panel when the world is bigger than it.
+#
+#   follow   - a panel-sized 1:1 window whose centre eases toward the busiest area
+#              (the coarse tile holding the most units, found with one bincount);
+#   overview - the whole map scaled down; render.py aggregates entities per panel pixel.
+#
+# Both only need arrays of unit positions, so the per-frame cost is one pass of numpy
+# over the units regardless of how large the map is.
+import numpy as np
+import config as C
+
+MODES = ("overview", "follow")
+
+class Camera:
+    def __init__(self, mode=C.CAMERA_MODE, world=(C.WIDTH, C.HEIGHT), view=(C.PANEL_W, C.PANEL_H)):
+        if mode not in MODES: raise ValueError(f"camera mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.world_w, self.world_h = world
+        self.view_w, self.view_h = view
+        self.sx = self.view_w / self.world_w     # overview scale, panel px per world px
+        self.sy = self.view_h / self.world_h
+        self.cx, self.cy = self.world_w / 2, self.world_h / 2   # follow centre
+        self.tile = max(self.view_w, self.view_h) // 2           # "busiest area" granularity
+
+    @property
+    def origin(self):
+        """Top-left world pixel of the follow window (integers, clamped to the map)."""
+        x0 = int(self.cx) - self.view_w // 2
+        y0 = int(self.cy) - self.view_h // 2
+        x0 = max(0, min(self.world_w - self.view_w, x0))
+        y0 = max(0, min(self.world_h - self.view_h, y0))
+        return x0, y0
+
+    def toggle(self):
+        self.mode = MODES[(MODES.index(self.mode) + 1) % len(MODES)]
+
+    def update(self, xs, ys):
+        """Ease the follow centre toward the densest tile of (xs, ys)."""
+        if self.mode != "follow" or not len(xs): return
+        t = self.tile
+        cols = int(self.world_w // t) + 1
+        tx = np.clip((xs // t).astype(np.intp), 0, cols - 1)
+        ty = np.clip((ys // t).astype(np.intp), 0, int(self.world_h // t))
+        cell = ty * cols + tx
+        best = np.bincount(cell).argmax()
+        sel = cell == best
+        k = C.CAMERA_FOLLOW_LERP
+        self.cx += (float(xs[sel].mean()) - self.cx) * k
+        self.cy += (float(ys[sel].mean()) - self.cy) * k
+
+def camera_for(world=(C.WIDTH, C.HEIGHT), view=(C.PANEL_W, C.PANEL_H)):
+    """A Camera when the world doesn't fit the panel 1:1, else None (draw directly)."""
+    return None if tuple(world) == tuple(view) else Camera(world=world, view=view)
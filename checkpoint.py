@@ -0,0 +1,255 @@
+# checkpoint.py
+# Whole-world snapshots in a small versioned binary file, so a reboot or power cut
+# resumes the round in progress instead of starting over:
+#
+#   python main.py --resume        # load CHECKPOINT_FILE if there is a usable one
+#   python main.py --headless --checkpoint PATH   # headless runs only save when asked
+#
+# main.py saves every CHECKPOINT_SECS of real time and after every round. A save packs
+# buildings (stocks, respawn queues), units (targets as list positions), the food and
+# resource pools, pheromones, tick, round_id and every RNG state into one bytes object,
+# then writes it via temp file + fsync + rename, so the file on disk is always a whole
+# checkpoint. A header CRC rejects anything else.
+import os, random, struct, time, zlib
+import numpy as np
+import config as C
+from entities import Unit, Building
+from combat import Combat
+from pheromone import PheromoneField
+from roster import UNIT_ROLES, BUILDING_TYPES, BuildingList
+from replay import config_fingerprint
+
+MAGIC   = b"ANTW"
+VERSION = 1
+# magic, version, num_teams, SoA units, width, height, config fingerprint, body length, body crc32
+_HEADER = struct.Struct("<4sBBBxIIIII")
+
+_NR = len(C.RESOURCE_TYPES)
+_SCALARS  = struct.Struct("<IIQ")                      # round_id, tick, round_seed
+_RANDOM   = struct.Struct("<625Id")                    # random.Random state, gauss_next (nan = none)
+_COUNT    = struct.Struct("<I")
+# x, y, team, btype, hp, stock_food, stock[res], cooldown, farm_timer, respawn entries
+_BUILDING = struct.Struct(f"<ddHBdd{_NR}iiiI")
+_RESPAWN  = struct.Struct("<iB")                       # ticks left, role
+# x, y, angle, speed, energy, health, team, role, home, carry_food, carry_res[res],
+# has wp, wp x, wp y, wp_t, ph, target kind, target index, tgt_t
+_UNIT     = struct.Struct(f"<6dHBii{_NR}iBddidBii")
+_PCG64    = struct.Struct("<16s16sBI")                 # state, inc, has_uint32, uinteger
+
+# Unit.tgt kinds: a kept target is stored as a list position, never as an object or handle
+T_NONE, T_ITEM, T_UNIT, T_BUILDING = 0, 1, 2, 3
+
+# ---------------- save ----------------
+def _pack_random(rng):
+    _, st, gauss = rng.getstate()
+    return _RANDOM.pack(*st, float("nan") if gauss is None else gauss)
+
+def _pack_pool(pool):
+    n = len(pool)
+    return b"".join((_COUNT.pack(n), pool.x.tobytes(), pool.y.tobytes(),
+                     pool.kind.tobytes(), pool.seq.tobytes()))
+
+def _target(u, units_at, buildings_at, foods_at, res_at):
+    t = u.tgt
+    if t is None: return T_NONE, 0
+    if isinstance(t, int):
+        k = (foods_at if u.role == "scavenger" else res_at).get(t)
+        return (T_NONE, 0) if k is None else (T_ITEM, k)
+    if isinstance(t, Building):
+        k = buildings_at.get(id(t))
+        return (T_NONE, 0) if k is None else (T_BUILDING, k)
+    k = units_at.get(id(t))
+    return (T_NONE, 0) if k is None else (T_UNIT, k)
+
+def dumps(world):
+    """The world as checkpoint bytes (header included)."""
+    buildings, units = world.buildings, world.units
+    buildings_at = {id(b): k for k, b in enumerate(buildings)}
+    units_at     = {id(u): k for k, u in enumerate(units)}
+    foods_at     = {h: k for k, h in enumerate(world.foods.handles())}
+    res_at       = {h: k for k, h in enumerate(world.resources.handles())}
+
+    out = [_SCALARS.pack(world.round_id, world.tick, world.round_seed),
+           _pack_random(world.rng), _pack_random(world.seeder),
+           struct.pack(f"<{C.NUM_TEAMS*4}d", *(float(w) for row in world.round_weights for w in row))]
+
+    out.append(_COUNT.pack(len(buildings)))
+    queue = []
+    for b in buildings:
+        out.append(_BUILDING.pack(b.x, b.y, b.team, BUILDING_TYPES.index(b.btype), b.hp, b.stock_food,
+                                  *(b.stock[k] for k in C.RESOURCE_TYPES), b._cooldown, b._farm_timer,
+                                  len(b.respawn_q)))
+        queue.extend(_RESPAWN.pack(t, UNIT_ROLES.index(r)) for t, r in b.respawn_q)
+    out.extend(queue)
+
+    out.append(_pack_pool(world.foods))
+    out.append(_pack_pool(world.resources))
+
+    out.append(_COUNT.pack(len(units)))
+    for u in units:
+        wp = u.wp or (0.0, 0.0)
+        kind, idx = _target(u, units_at, buildings_at, foods_at, res_at)
+        out.append(_UNIT.pack(u.x, u.y, u.angle, u.speed, u.energy, u.health,
+                              u.team, UNIT_ROLES.index(u.role), buildings_at[id(u.home)],
+                              u.carry_food, *(u.carry_res[k] for k in C.RESOURCE_TYPES),
+                              u.wp is not None, wp[0], wp[1], u.wp_t, u.ph, kind, idx, u.tgt_t))
+
+    pher = world.pheromones
+    out.append(struct.pack("<B", pher is not None))
+    if pher is not None: out.append(pher.grid.tobytes())
+
+    urng = getattr(world.units, "rng", None)   # swarm.UnitStore movement jitter
+    out.append(struct.pack("<B", urng is not None))
+    if urng is not None:
+        st = urng.bit_generator.state
+        out.append(_PCG64.pack(st["state"]["state"].to_bytes(16, "little"),
+                               st["state"]["inc"].to_bytes(16, "little"),
+                               st["has_uint32"], st["uinteger"]))
+
+    body = b"".join(out)
+    head = _HEADER.pack(MAGIC, VERSION, C.NUM_TEAMS, bool(C.SOA_UNITS), C.WIDTH, C.HEIGHT,
+                        config_fingerprint(), len(body), zlib.crc32(body))
+    return head + body
+
+def save(world, path=C.CHECKPOINT_FILE):
+    """Atomically replace `path` with a checkpoint of `world`. Returns the seconds it took."""
+    t0 = time.perf_counter()
+    data = dumps(world)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return time.perf_counter() - t0
+
+# ---------------- load ----------------
+class _Cursor:
+    def __init__(self, data, off):
+        self.data, self.off = data, off
+
+    def take(self, st):
+        v = st.unpack_from(self.data, self.off)
+        self.off += st.size
+        return v
+
+    def many(self, st, n):
+        end = self.off + st.size * n
+        v = list(st.iter_unpack(self.data[self.off:end]))
+        self.off = end
+        return v
+
+    def raw(self, n):
+        v = self.data[self.off:self.off + n]
+        self.off += n
+        return v
+
+def _unpack_random(cur):
+    v = cur.take(_RANDOM)
+    rng = random.Random()
+    rng.setstate((3, tuple(v[:625]), None if v[625] != v[625] else v[625]))
+    return rng
+
+def _unpack_pool(cur):
+    (n,) = cur.take(_COUNT)
+    xs = np.frombuffer(cur.raw(8*n), "<f8").tolist()
+    ys = np.frombuffer(cur.raw(8*n), "<f8").tolist()
+    kinds = np.frombuffer(cur.raw(n), "i1").tolist()
+    seqs = np.frombuffer(cur.raw(8*n), "<i8").tolist()
+    return xs, ys, kinds, seqs
+
+def loads(world, data):
+    """Replace the round in `world` (made by world.new_world with the current config) with
+       the checkpointed one. Raises ValueError if `data` is not a matching, intact checkpoint."""
+    if len(data) < _HEADER.size:
+        raise ValueError("checkpoint truncated")
+    magic, ver, teams, soa, w, h, fp, size, crc = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or ver != VERSION:
+        raise ValueError(f"not a v{VERSION} world checkpoint")
+    if (teams, bool(soa), w, h) != (C.NUM_TEAMS, bool(C.SOA_UNITS), C.WIDTH, C.HEIGHT):
+        raise ValueError(f"checkpoint is for {teams} teams, {w}x{h}, SOA_UNITS={bool(soa)}")
+    if fp != config_fingerprint():
+        raise ValueError("checkpoint was saved under a different gameplay config")
+    body = memoryview(data)[_HEADER.size:_HEADER.size + size]
+    if len(body) != size or zlib.crc32(body) != crc:
+        raise ValueError("checkpoint is damaged (length/CRC mismatch)")
+    cur = _Cursor(body, 0)
+
+    world.round_id, world.tick, world.round_seed = cur.take(_SCALARS)
+    world.rng = rng = _unpack_random(cur)
+    world.seeder = _unpack_random(cur)
+    flat = cur.take(struct.Struct(f"<{teams*4}d"))
+    world.round_weights = [list(flat[t*4:t*4+4]) for t in range(teams)]
+    world.meta_state["role_weights"] = [list(r) for r in world.round_weights]
+    C.ROLE_WEIGHTS = world.meta_state["role_weights"]
+
+    world.pheromones = pher = (PheromoneField(C.NUM_TEAMS, C.WIDTH, C.HEIGHT)
+                               if C.FORAGE_MODE == "pheromone" else None)
+    world.combat = combat = Combat() if C.BATCHED_COMBAT else None   # empty between ticks
+
+    (nb,) = cur.take(_COUNT)
+    rows = cur.many(_BUILDING, nb)
+    world.buildings = buildings = BuildingList()
+    for v in rows:
+        x, y, team, bt, hp, food = v[:6]
+        btype = BUILDING_TYPES[bt]
+        b = Building(x, y, team, btype, hp=hp, stock_food=food,
+                     stock=dict(zip(C.RESOURCE_TYPES, v[6:6+_NR])),
+                     rng=rng, pher=pher if btype == "home" else None, combat=combat)
+        b._cooldown, b._farm_timer = v[6+_NR], v[7+_NR]
+        buildings.append(b)
+    for b, v in zip(buildings, rows):
+        b.respawn_q = [(t, UNIT_ROLES[r]) for t, r in cur.many(_RESPAWN, v[-1])]
+
+    world.foods, world.resources = world.new_item_pools()
+    foods = world.foods.restore(*_unpack_pool(cur))
+    res   = world.resources.restore(*_unpack_pool(cur))
+
+    (nu,) = cur.take(_COUNT)
+    rows = cur.many(_UNIT, nu)
+    objs = []
+    for v in rows:
+        u = Unit.__new__(Unit)   # Unit() would draw a heading from the round RNG
+        u.x, u.y, u.angle, u.speed, u.energy, u.health = v[:6]
+        u.team, u.role, u.home = v[6], UNIT_ROLES[v[7]], buildings[v[8]]
+        u.carry_food = v[9]
+        u.carry_res = dict(zip(C.RESOURCE_TYPES, v[10:10+_NR]))
+        has_wp, wx, wy, u.wp_t, u.ph, _, _, u.tgt_t = v[10+_NR:]
+        u.wp = (wx, wy) if has_wp else None
+        u.tgt = None
+        objs.append(u)
+    for u, v in zip(objs, rows):
+        kind, idx = v[-3], v[-2]
+        if kind == T_ITEM:   u.tgt = (foods if u.role == "scavenger" else res)[idx]
+        elif kind == T_UNIT: u.tgt = objs[idx]
+        elif kind == T_BUILDING: u.tgt = buildings[idx]
+
+    (has_pher,) = cur.take(struct.Struct("<B"))
+    if has_pher:
+        if pher is None:
+            raise ValueError("checkpoint has pheromones but FORAGE_MODE is not 'pheromone'")
+        grid = np.frombuffer(cur.raw(4 * pher.grid.size), "<f4")
+        pher.grid[...] = grid.reshape(pher.grid.shape)
+
+    (has_urng,) = cur.take(struct.Struct("<B"))
+    world.units = units = world.new_unit_list()
+    if has_urng:
+        s, inc, has32, uint = cur.take(_PCG64)
+        units.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": int.from_bytes(s, "little"), "inc": int.from_bytes(inc, "little")},
+            "has_uint32": has32, "uinteger": uint}
+    units.extend(objs)
+    # unit targets were resolved against the plain Units; the swarm list holds views of them
+    if units and units[0] is not objs[0]:
+        view = {id(o): v for o, v in zip(objs, units)}
+        for v in units:
+            if isinstance(v.tgt, Unit): v.tgt = view[id(v.tgt)]
+    for u in units:
+        if isinstance(u.tgt, int):
+            (world.foods if u.role == "scavenger" else world.resources).claim(u.tgt, id(u))
+    return world
+
+def load(world, path=C.CHECKPOINT_FILE):
+    with open(path, "rb") as f:
+        return loads(world, f.read())
@@ -0,0 +1,113 @@
+# combat.py
+# Combat as its own phase of the tick (BATCHED_COMBAT). While units think they only
+# record attack intents (who swings at what, reach, damage), and ready towers only
+# say they are ready. After every unit has moved, Combat.resolve() settles all of it
+# at once:
+#
+#   - melee / siege: one vectorized distance check of every attacker against its
+#     target's end-of-tick position; damage per target is summed (np.bincount) and
+#     applied once, so who updated first no longer matters;
+#   - towers: nearest enemy non-reproducer within TOWER_RANGE for all ready towers
+#     together, from a towers x units distance matrix computed in blocks (bounded
+#     memory for big battles). Ties go to the unit first in the list, like
+#     roster.nearest_enemy.
+#
+# Units hurt this tick die at the start of their next think(), whatever their place in
+# the list.
+import numpy as np
+import config as C
+from entities import Unit
+
+_BLOCK = 1 << 20   # most tower x unit distances held at once
+
+def _unit_arrays(units):
+    """x, y, team and a 'can be shot' mask (not a reproducer) for every unit, list order."""
+    if hasattr(units, "coords"):                     # swarm.UnitStore
+        x, y, team = units.coords()
+        from swarm import REPRO
+        return x, y, team, units.role[:units.n] != REPRO
+    n = len(units)
+    return (np.fromiter((u.x for u in units), float, n),
+            np.fromiter((u.y for u in units), float, n),
+            np.fromiter((u.team for u in units), np.intp, n),
+            np.fromiter((u.role != "reproducer" for u in units), bool, n))
+
+class Combat:
+    """Attack intents of the current tick; the world calls resolve() once per tick."""
+
+    def __init__(self):
+        self.src, self.tgt, self.reach2, self.dmg = [], [], [], []
+        self.towers = []
+
+    def strike(self, unit, target, reach, damage):
+        """`unit` attacks `target` (Unit or Building) if within `reach` px after moving."""
+        self.src.append(unit); self.tgt.append(target)
+        self.reach2.append(reach * reach); self.dmg.append(damage)
+
+    def tower_ready(self, tower):
+        self.towers.append(tower)
+
+    def resolve(self, units, buildings):
+        if self.towers:
+            self._fire_towers(units)
+        if self.src:
+            self._resolve_strikes(units, buildings)
+
+    def _resolve_strikes(self, units, buildings):
+        src, tgt = self.src, self.tgt
+        reach2, dmg = np.array(self.reach2), np.array(self.dmg)
+        self.src, self.tgt, self.reach2, self.dmg = [], [], [], []
+        n = len(src)
+        sx = np.fromiter((u.x for u in src), float, n); sy = np.fromiter((u.y for u in src), float, n)
+        tx = np.fromiter((t.x for t in tgt), float, n); ty = np.fromiter((t.y for t in tgt), float, n)
+        hits = np.flatnonzero((sx - tx)**2 + (sy - ty)**2 < reach2)
+        # targets that left the world this tick (died, destroyed) take no more damage
+        hits = [i for i in hits.tolist()
+                if (units.has(tgt[i]) if isinstance(tgt[i], Unit) else buildings.has(tgt[i]))]
+        if not hits: return
+
+        ids = np.fromiter((id(tgt[i]) for i in hits), np.int64, len(hits))
+        keys, first, inv = np.unique(ids, return_index=True, return_inverse=True)
+        total = np.bincount(inv, weights=dmg[hits], minlength=len(keys))
+
+        razed = []
+        for k, d in zip(first.tolist(), total.tolist()):
+            t = tgt[hits[k]]
+            if isinstance(t, Unit):
+                t.health -= d
+            else:
+                t.hp -= d
+                if t.hp <= 0: razed.append(t)
+        for i in hits:   # siege salvage goes to every attacker that landed a blow
+            t = tgt[i]
+            if not isinstance(t, Unit):
+                carry = src[i].carry_res
+                for k, v in C.BUILD_COSTS.get(t.btype, {}).items():
+                    salv = max(0, int(round(v * C.SALVAGE_RATE)))
+                    if salv > 0: carry[k] += salv
+        for b in razed:
+            buildings.discard(b)
+
+    def _fire_towers(self, units):
+        towers, self.towers = self.towers, []
+        if not len(units): return
+        ux, uy, uteam, shootable = _unit_arrays(units)
+        bx = np.array([b.x for b in towers]); by = np.array([b.y for b in towers])
+        bteam = np.array([b.team for b in towers])
+        r2 = C.TOWER_RANGE * C.TOWER_RANGE
+        pick = np.full(len(towers), -1, np.intp)
+        step = max(1, _BLOCK // len(ux))
+        for lo in range(0, len(towers), step):
+            hi = lo + step
+            d2 = (bx[lo:hi, None] - ux[None, :])**2 + (by[lo:hi, None] - uy[None, :])**2
+            ok = shootable[None, :] & (uteam[None, :] != bteam[lo:hi, None]) & (d2 < r2)
+            d2 = np.where(ok, d2, np.inf)
+            best = d2.argmin(axis=1)          # first index on ties = earliest in the list
+            found = ok[np.arange(len(best)), best]
+            pick[lo:hi] = np.where(found, best, -1)
+
+        shots = np.bincount(pick[pick >= 0], minlength=len(ux))
+        for i in np.flatnonzero(shots):
+            units[i].health -= C.TOWER_DAMAGE * int(shots[i])
+        for b, p in zip(towers, pick.tolist()):
+            if p >= 0: b._cooldown = C.TOWER_COOLDOWN_TICKS
@@ -1,12 +1,32 @@
 # -------- Display (Pi friendly) --------
-WIDTH  = 128      # Waveshare 1.44" is 128x128
+PANEL_W = 128     # Waveshare 1.44" is 128x128
+PANEL_H = 128
+FPS    = 30       # simulation steps per second of real time (fixed timestep)
+RENDER_FPS        = 30   # frames drawn + presented per second, independent of FPS
+MAX_CATCHUP_STEPS = 5    # most steps run back-to-back when behind; the rest is dropped
+MAX_FRAMESKIP     = 4    # most frames skipped in a row while catching up
+
+# -------- World size --------
+# May be larger than the panel (e.g. 2048x2048 with SOA_UNITS); the panel then shows
+# the world through a camera (camera.py / render.py).
+WIDTH  = 128
 HEIGHT = 128
-FPS    = 30
+CAMERA_MODE        = "overview"  # "overview": whole map, density per panel pixel
+                                 # "follow":   1:1 window that tracks the busiest area
+CAMERA_FOLLOW_LERP = 0.08        # fraction of the way to the target per frame
+OVERVIEW_SATURATE  = 6           # entities per panel pixel drawn at full brightness
+# Foragers only look for food/resources this close (px); None = anywhere on the map.
+# Bounds the grid search on big, sparse maps.
+SENSE_RANGE        = None
 
 # -------- Backend toggle --------
 # SIM=True shows a pygame window; SIM=False pushes to SPI LCD
 SIM = False
 
+# Push frames from a separate process (display_proc.py) so SPI never stalls the sim;
+# frames the panel can't keep up with are dropped.
+DISPLAY_PROCESS = False
+
 # --- LCD (your backends read these) ---
 SPI_HZ = 8_000_000
 # ST7735 MADCTL; change if orientation/colors are off
@@ -18,10 +38,29 @@ Y0 = 2
 # --- SIM (window) niceties ---
 SCALE = 3
 WINDOW_TITLE = "Ant Colony (LCDSim)"
+SIM_HEADLESS = False     # LCDSim without a window (timing model / capture only)
+SIM_SPI_PACE = False     # LCDSim blocks each push for its modeled SPI time, like the panel
+# Record every frame LCDSim is pushed to this file (raw panel bytes, bgr565be), or None.
+#   ffmpeg -f rawvideo -pix_fmt bgr565be -s 128x128 -r 30 -i frames.raw out.mp4
+SIM_CAPTURE        = None
+SIM_CAPTURE_FRAMES = 9000   # capture capacity in frames (file is preallocated)
 
 # -------- Teams / Population --------
 NUM_TEAMS   = 2
-TEAM_COLORS = [(255, 60, 60), (80, 140, 255)]
+
+def team_colors(n):
+    """Red and blue first, then hues spread by the golden ratio so neighbours differ."""
+    import colorsys
+    cols = [(255, 60, 60), (80, 140, 255)][:n]
+    for t in range(len(cols), n):
+        h = (0.13 + t * 0.618034) % 1.0
+        cols.append(tuple(int(c*255) for c in colorsys.hsv_to_rgb(h, 0.75, 1.0)))
+    return cols
+
+TEAM_COLORS = team_colors(NUM_TEAMS)
+# Where homes go: "ring" (ellipse inside the map margin, team 0 on the left) or "grid".
+# Both put two teams left/right at mid height. Many teams want a bigger world.
+HOME_LAYOUT = "ring"
 START_UNITS = {  # per team
     "scavenger": 6,
     "builder":   4,   # YOUR CHANGE
@@ -30,7 +69,13 @@ START_UNITS = {  # per team
     "reproducer":1,   # spawns at home; never counts for survival
 }
 MAX_TEAM_POP   = 55    # YOUR CHANGE
+# Keep unit state in numpy arrays with batched movement/needs (swarm.py).
+# Worth it for thousands of ants; per-unit ordering differs slightly (see swarm.py).
+SOA_UNITS      = False
 RESPAWN_TICKS  = 8 * FPS
+# Units that come off a home's respawn queue join the world. False keeps the original
+# rules: the queue still runs and charges food, but the respawned unit never appears.
+RESPAWN_JOINS_WORLD = False
 
 # Runtime-tuned by meta.py / main.py (per-team lists [scav, builder, defender, attacker])
 ROLE_WEIGHTS = [[5,2,2,1] for _ in range(NUM_TEAMS)]
@@ -40,6 +85,25 @@ BASE_SPEED   = 0.6
 TURN_SPEED   = 0.08
 FORAGE_WAYPOINT_DIST = int(min(WIDTH, HEIGHT) * 0.35)
 FORAGE_TIMEOUT       = 4 * FPS
+# How scavengers find food:
+#   "nearest":   head for the closest food anywhere (grid search)
+#   "pheromone": see food only within PHER_FOOD_SIGHT, otherwise follow the colony's
+#                food trail or wander; trails evaporate and diffuse (pheromone.py)
+FORAGE_MODE          = "nearest"
+# Units keep their target between ticks and re-search only when it is gone or after
+# RETARGET_TICKS; food/resources are claimed so two gatherers never chase the same item.
+TARGET_CLAIMS        = True
+RETARGET_TICKS       = 15
+PHER_CELL            = 2        # world px per pheromone cell
+PHER_EVAPORATE       = 0.01     # fraction lost per tick
+PHER_DIFFUSE         = 0.05     # fraction exchanged with the 4 neighbours per tick
+PHER_DEPOSIT         = 1.0      # laid at the source (food pickup / home)
+PHER_DEPOSIT_DECAY   = 0.985    # per step away from the source, so trails point back to it
+PHER_MAX             = 4.0
+PHER_MIN             = 0.02     # weaker than this is not followed
+PHER_SENSE_DIST      = 5        # px ahead of the ant
+PHER_SENSE_ANGLE     = 0.6      # rad, left/right sensor offset
+PHER_FOOD_SIGHT      = 10       # px; food this close is seen directly
 OUTWARD_BIAS         = 0.10
 ATTACKER_SPEED_MULT  = 0.35   # 35% of BASE_SPEED
 
@@ -77,6 +141,16 @@ TOWER_RANGE = 48
 TOWER_COOLDOWN_TICKS = int(0.8 * FPS)
 TOWER_DAMAGE = 0.12
 
+# -------- Combat --------
+MELEE_REACH     = 5      # px; defenders / attackers hit units this close
+SIEGE_REACH     = 6      # px; attackers hit buildings this close
+DEFENDER_DAMAGE = 0.05
+ATTACKER_DAMAGE = 0.06
+SIEGE_DAMAGE    = 0.08   # building hp per hit (buildings start at 1.0)
+# Units and towers only declare attacks while updating; combat.py settles all of them
+# in one vectorized phase after movement, so damage no longer depends on list order.
+BATCHED_COMBAT  = True
+
 BUILD_COSTS = {
     "tower":   {"metal": 3, "stone": 2, "wood": 1},
     "farm":    {"wood": 2},   # YOUR CHANGE
@@ -95,9 +169,21 @@ MAX_WALLS    = 10
 
 REPRODUCE_FOOD_COST = 2
 
+# -------- Profiling (profiler.py; also main.py --profile) --------
+PROFILE             = False   # per-phase tick timings -> stdout/run.log
+PROFILE_HUD         = False   # also show p95 frame time + overrun count on the HUD
+PROFILE_RING        = 256     # frames kept for p50/p95/max
+PROFILE_REPORT_SECS = 10
+
 # -------- Round / learning --------
 ROUND_MAX_TICKS = 4 * 60 * FPS   # safety cap
-META_FILE = "meta.json"
+META_FILE = "meta.json"            # role-weight snapshot (meta.py)
+META_LOG  = "meta.log"             # append-only round history
+META_SNAPSHOT_ROUNDS = 20          # rewrite META_FILE every this many rounds
+# Whole-world snapshot for main.py --resume (checkpoint.py); saved every
+# CHECKPOINT_SECS of real time and after every round. 0 = never.
+CHECKPOINT_FILE = "world.ckpt"
+CHECKPOINT_SECS = 30
 
 # -------- Visual-only tweaks for tiny 128x128 display --------
 # These DO NOT affect gameplay logic (e.g., HOME_RADIUS still used for logic).
@@ -108,4 +194,4 @@ VIS_BUILD_R    = 3      # non-home building radius
 VIS_HOME_R     = 8      # visual home circle; logic still uses HOME_RADIUS
 VIS_WALL_W     = 2      # wall line thickness
 DRAW_HEALTH_BARS = False # set True if you want tiny health ticks
-HUD_FONT_SIZE    = 8     # small HUD font on 128x128
+HUD_FONT_SCALE   = 1     # built-in 3x5 HUD font (hud.py), integer zoom
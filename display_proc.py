@@ -0,0 +1,94 @@
+# display_proc.py
+# Run the LCD backend in its own process so slow SPI never stalls the simulation.
+#
+# The sim publishes finished BGR565 frames ('>u2', panel byte order) into one of two
+# shared-memory buffers; the display process sends whichever frame is newest.
+# Handshake (all under the control array's lock):
+#   writer: picks the buffer the reader is NOT holding; if that buffer held an
+#           unread frame, that frame is dropped; copies; publishes it as `latest`.
+#   reader: takes `latest` (marks it `reading`), pushes it, releases it.
+# The writer never waits for the panel: at worst it replaces an unsent frame.
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+LATEST, READING, SENT, DROPPED = range(4)
+
+def bgr565_to_rgb(fb):
+    """(H, W) '>u2' BGR565 -> (H, W, 3) uint8 RGB, for backends without push_bgr565."""
+    v = fb.astype(np.uint16)
+    rgb = np.empty(fb.shape + (3,), dtype=np.uint8)
+    rgb[...,0] = (v & 0x1F) << 3
+    rgb[...,1] = ((v >> 5) & 0x3F) << 2
+    rgb[...,2] = (v >> 11) << 3
+    return rgb
+
+def _frames(shm, w, h):
+    return np.ndarray((2, h, w), dtype=">u2", buffer=shm.buf)
+
+def _worker(shm_name, w, h, ctl, wake, stop):
+    from lcd import get_lcd
+    shm = shared_memory.SharedMemory(name=shm_name)   # the parent owns and unlinks it
+    frames = _frames(shm, w, h)
+    lcd = get_lcd()
+    native = hasattr(lcd, "push_bgr565")
+    try:
+        while not stop.is_set():
+            if not wake.wait(0.1): continue
+            with ctl.get_lock():
+                wake.clear()
+                b = ctl[LATEST]
+                if b < 0: continue
+                ctl[LATEST], ctl[READING] = -1, b
+            if native: lcd.push_bgr565(frames[b])
+            else:      lcd.push_numpy_rgb(bgr565_to_rgb(frames[b]))
+            with ctl.get_lock():
+                ctl[READING] = -1
+                ctl[SENT] += 1
+    finally:
+        try: lcd.close()
+        except Exception: pass
+        del frames
+        shm.close()
+
+class DisplayProcess:
+    """Sim-side handle: publish() frames, close() when done."""
+
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * w * h * 2)
+        self.frames = _frames(self.shm, w, h)
+        ctx = mp.get_context("spawn")   # fresh interpreter: no inherited SDL/GPIO state
+        self.ctl = ctx.Array("i", [-1, -1, 0, 0])
+        self.wake, self.stop = ctx.Event(), ctx.Event()
+        self.proc = ctx.Process(target=_worker, name="lcd-display", daemon=True,
+                                args=(self.shm.name, w, h, self.ctl, self.wake, self.stop))
+        self.proc.start()
+
+    def publish(self, src):
+        """Copy an (H, W) uint16 frame (any byte order) into the free buffer and publish it.
+           `src` may be a transposed surfarray view; numpy handles the strides/byte swap."""
+        ctl = self.ctl
+        with ctl.get_lock():
+            b = 1 - ctl[READING] if ctl[READING] >= 0 else (1 - ctl[LATEST] if ctl[LATEST] >= 0 else 0)
+            if ctl[LATEST] == b:   # reader never got to it: drop
+                ctl[LATEST] = -1
+                ctl[DROPPED] += 1
+        np.copyto(self.frames[b], src)
+        with ctl.get_lock():
+            if ctl[LATEST] >= 0:   # the other buffer's frame is now stale too
+                ctl[DROPPED] += 1
+            ctl[LATEST] = b
+        self.wake.set()
+
+    def stats(self):
+        with self.ctl.get_lock():
+            return {"sent": self.ctl[SENT], "dropped": self.ctl[DROPPED]}
+
+    def close(self):
+        self.stop.set(); self.wake.set()
+        self.proc.join(2.0)
+        if self.proc.is_alive(): self.proc.terminate()
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
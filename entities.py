@@ -1,12 +1,15 @@
-import math, random, pygame
+import functools, math, random, pygame
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import List, Dict, Any
 from config import *
+from pool import ItemPool
+from pheromone import FOOD_TRAIL, HOME_TRAIL
 
 # ---------------- helpers ----------------
 def clamp(x, lo, hi): return lo if x < lo else hi if x > hi else x
 def dist2(ax, ay, bx, by): dx, dy = ax - bx, ay - by; return dx*dx + dy*dy
 
+@functools.lru_cache(maxsize=None)
 def building_fill_color(btype: str):
     if btype == "home":
         return BUILDING_COLORS["home"]
@@ -15,6 +18,8 @@ def building_fill_color(btype: str):
     dom = max(cost.items(), key=lambda kv: kv[1])[0]
     return RES_COLORS.get(dom, (200,200,200))
 
+_SENSE_D2 = None if SENSE_RANGE is None else SENSE_RANGE * SENSE_RANGE
+
 def _px(surf, x, y, col):
     if 0 <= x < WIDTH and 0 <= y < HEIGHT:
         surf.set_at((int(x), int(y)), col)
@@ -49,29 +54,69 @@ def _draw_icon(surf, cx, cy, pattern, color):
             if ch != " ":
                 _px(surf, cx + ox + i, cy + oy + j, color)
 
-# ---------------- world objects ----------------
-@dataclass
-class Resource:
-    x: float; y: float; rtype: str
-    def draw(self, surf):
-        r = max(1, VIS_RES_R)
-        if r <= 1:
-            _px(surf, int(self.x), int(self.y), RES_COLORS[self.rtype])
-        else:
-            pygame.draw.circle(surf, RES_COLORS[self.rtype], (int(self.x), int(self.y)), r)
+def draw_building_shape(surf, btype, team, cx, cy):
+    """Everything about a building's look that never changes (render.py caches it as a
+       sprite). Returns the visual radius."""
+    fill = building_fill_color(btype)
+    teamc = TEAM_COLORS[team]
 
-@dataclass
-class Food:
-    x: float; y: float
-    def draw(self, surf):
-        r = max(1, VIS_FOOD_R)
-        if r <= 1:
-            _px(surf, int(self.x), int(self.y), FOOD_COLOR)
-        else:
-            pygame.draw.circle(surf, FOOD_COLOR, (int(self.x), int(self.y)), r)
+    if btype == "wall":
+        x1, y1 = cx - 5, cy
+        x2, y2 = cx + 5, cy
+        pygame.draw.line(surf, fill, (x1,y1), (x2,y2), max(1, VIS_WALL_W))
+        return max(1, VIS_WALL_W)
+
+    if btype == "home":
+        r_vis = max(3, VIS_HOME_R)
+        # Team-colored ring
+        pygame.draw.circle(surf, teamc, (cx, cy), r_vis, 2 if r_vis >= 4 else 1)
+        # Compact center fill
+        inner = max(1, r_vis - 2)
+        pygame.draw.circle(surf, BUILDING_COLORS["home"], (cx, cy), inner, 0)
+    else:
+        r_vis = max(2, VIS_BUILD_R)
+        pygame.draw.circle(surf, fill, (cx, cy), r_vis, 0)
+        if r_vis >= 2:
+            pygame.draw.circle(surf, teamc, (cx, cy), r_vis, 1)
+
+        # Micro icon overlay (white for clarity on resource-colored fill)
+        icon_color = (240, 240, 240)
+        if btype == "tower":
+            _draw_icon(surf, cx, cy, _ICON_TOWER, icon_color)
+        elif btype == "farm":
+            _draw_icon(surf, cx, cy, _ICON_FARM, icon_color)
+        elif btype == "storage":
+            _draw_icon(surf, cx, cy, _ICON_STORAGE, icon_color)
+    return r_vis
+
+# ---------------- spatial queries ----------------
+class Locatable:
+    """Query helpers for anything with x/y/team; `items` is a spatial.IndexedList or IndexedSet
+       (nearest() also works on a pool.ItemPool)."""
+    __slots__ = ()
+
+    def nearest(self, items, pred=None, max_d2=None):
+        return items.nearest(self.x, self.y, pred, max_d2)
+
+    def k_nearest(self, items, k, pred=None, max_d2=None):
+        return items.k_nearest(self.x, self.y, k, pred, max_d2)
+
+    def within(self, items, r, pred=None):
+        return items.within(self.x, self.y, r*r, pred)
+
+    def nearest_enemy(self, units, max_d2=None):
+        """Closest enemy non-reproducer; `units` is a roster.TeamRoster list."""
+        return units.nearest_enemy(self.x, self.y, self.team, max_d2)
+
+    def is_ally_unit(self, u): return u.team == self.team
+    def is_enemy_unit(self, u): return u.team != self.team and u.role != "reproducer"
+
+# ---------------- world objects ----------------
+# Food and resources live in pool.ItemPool (handles, not objects); resource kind = index
+# into RESOURCE_TYPES.
 
 @dataclass
-class Building:
+class Building(Locatable):
     x: float; y: float; team: int; btype: str
     hp: float = 1.0
     stock_food: float = HOME_START_FOOD
@@ -79,64 +124,41 @@ class Building:
     respawn_q: List[tuple] = field(default_factory=list)  # (ticks_remaining, role)
     _cooldown:int = 0
     _farm_timer:int = 0
+    # world RNG (random.Random); units reach it via their home. Module default = unseeded.
+    rng: Any = field(default=random, repr=False, compare=False)
+    # pheromone.PheromoneField of the round (homes only, FORAGE_MODE = "pheromone")
+    pher: Any = field(default=None, repr=False, compare=False)
+    # combat.Combat of the round (BATCHED_COMBAT); units reach it via their home
+    combat: Any = field(default=None, repr=False, compare=False)
 
     def is_home(self): return self.btype == "home"
 
     def draw(self, surf):
-        fill = building_fill_color(self.btype)
-        teamc = TEAM_COLORS[self.team]
-        cx, cy = int(self.x), int(self.y)
-
-        if self.btype == "wall":
-            x1, y1 = int(self.x - 5), int(self.y)
-            x2, y2 = int(self.x + 5), int(self.y)
-            pygame.draw.line(surf, fill, (x1,y1), (x2,y2), max(1, VIS_WALL_W))
-            return
-
-        if self.is_home():
-            r_vis = max(3, VIS_HOME_R)
-            # Team-colored ring
-            pygame.draw.circle(surf, teamc, (cx, cy), r_vis, 2 if r_vis >= 4 else 1)
-            # Compact center fill
-            inner = max(1, r_vis - 2)
-            pygame.draw.circle(surf, BUILDING_COLORS["home"], (cx, cy), inner, 0)
-        else:
-            r_vis = max(2, VIS_BUILD_R)
-            pygame.draw.circle(surf, fill, (cx, cy), r_vis, 0)
-            if r_vis >= 2:
-                pygame.draw.circle(surf, teamc, (cx, cy), r_vis, 1)
-
-            # Micro icon overlay (white for clarity on resource-colored fill)
-            icon_color = (240, 240, 240)
-            if self.btype == "tower":
-                _draw_icon(surf, cx, cy, _ICON_TOWER, icon_color)
-            elif self.btype == "farm":
-                _draw_icon(surf, cx, cy, _ICON_FARM, icon_color)
-            elif self.btype == "storage":
-                _draw_icon(surf, cx, cy, _ICON_STORAGE, icon_color)
+        r_vis = draw_building_shape(surf, self.btype, self.team, int(self.x), int(self.y))
+        self.draw_health(surf, r_vis)
 
+    def draw_health(self, surf, r_vis):
         # Optional tiny health tick (off by default)
-        if (not self.is_home()) and DRAW_HEALTH_BARS:
-            w = max(1, int(6*self.hp))  # small
-            pygame.draw.line(surf, teamc, (cx-3, cy + r_vis + 1), (cx-3 + w, cy + r_vis + 1), 1)
+        if self.btype in ("home", "wall") or not DRAW_HEALTH_BARS: return
+        cx, cy = int(self.x), int(self.y)
+        w = max(1, int(6*self.hp))  # small
+        pygame.draw.line(surf, TEAM_COLORS[self.team], (cx-3, cy + r_vis + 1), (cx-3 + w, cy + r_vis + 1), 1)
 
-    def update(self, allies, enemies, buildings, foods):
+    def update(self, units, buildings, foods):
         if self.btype == "tower":
-            self._tick_tower(enemies)
+            self._tick_tower(units)
         elif self.btype == "farm":
             self._tick_farm(foods)
         if self.is_home():
-            self._tick_respawns(allies)
-            self._feed_allies_inside(allies)
+            self._tick_respawns(units)
+            self._feed_allies_inside(units)
 
-    def _tick_tower(self, enemies):
+    def _tick_tower(self, units):
         if self._cooldown > 0:
             self._cooldown -= 1; return
-        tgt = None; best = 1e18
-        for e in enemies:
-            d2 = dist2(e.x, e.y, self.x, self.y)
-            if d2 < TOWER_RANGE*TOWER_RANGE and d2 < best:
-                best = d2; tgt = e
+        if self.combat is not None:
+            self.combat.tower_ready(self); return   # aimed and fired in the combat phase
+        tgt = self.nearest_enemy(units, max_d2=TOWER_RANGE*TOWER_RANGE)
         if tgt:
             tgt.health -= TOWER_DAMAGE
             self._cooldown = TOWER_COOLDOWN_TICKS
@@ -145,41 +167,44 @@ class Building:
         self._farm_timer += 1
         if self._farm_timer >= FARM_YIELD_TICKS:
             self._farm_timer = 0
-            foods.append(Food(self.x + random.randint(-10,10),
-                              self.y + random.randint(-10,10)))
+            foods.add(self.x + self.rng.randint(-10,10),
+                      self.y + self.rng.randint(-10,10))
 
-    def _tick_respawns(self, allies):
+    def _tick_respawns(self, units):
         keep=[]
         for t_left, role in self.respawn_q:
             if t_left>0:
                 keep.append((t_left-1, role)); continue
             if role == "reproducer":
-                allies.append(Unit(self.x, self.y, self.team, role, self))
+                self._respawn(units, role)
                 continue
             if self.stock_food >= REPRODUCE_FOOD_COST:
                 self.stock_food -= REPRODUCE_FOOD_COST
-                allies.append(Unit(self.x, self.y, self.team, role, self))
+                self._respawn(units, role)
             else:
                 keep.append((FPS, role))
         self.respawn_q = keep
 
-    def _feed_allies_inside(self, allies):
+    def _respawn(self, units, role):
+        if RESPAWN_JOINS_WORLD:
+            units.append(Unit(self.x, self.y, self.team, role, self))
+
+    def _feed_allies_inside(self, units):
         if self.stock_food <= 0: return
-        r2 = (HOME_RADIUS + 2) ** 2
-        for u in allies:
-            if dist2(u.x,u.y,self.x,self.y) <= r2 and u.energy < 1.0 and self.stock_food > 0:
+        for u in self.within(units, HOME_RADIUS + 2, pred=self.is_ally_unit):
+            if u.energy < 1.0 and self.stock_food > 0:
                 eat = min(FOOD_EAT_PER_TICK, self.stock_food)
                 self.stock_food -= eat
                 u.energy = min(1.0, u.energy + eat * ENERGY_PER_FOOD)
 
 # ---------------- units ----------------
-class Unit:
+class Unit(Locatable):
     __slots__ = ("x","y","team","role","home","angle","speed","energy","health",
-                 "carry_food","carry_res","wp","wp_t")
+                 "carry_food","carry_res","wp","wp_t","ph","tgt","tgt_t")
 
     def __init__(self, x, y, team, role, home: Building):
         self.x=x; self.y=y; self.team=team; self.role=role; self.home=home
-        self.angle = random.uniform(0, math.pi*2)
+        self.angle = home.rng.uniform(0, math.pi*2)
         self.speed = BASE_SPEED * (ATTACKER_SPEED_MULT if role == "attacker" else 1.0)
         self.energy = START_ENERGY
         self.health = START_HEALTH
@@ -187,6 +212,9 @@ class Unit:
         self.carry_res = {k:0 for k in RESOURCE_TYPES}
         self.wp = None
         self.wp_t = 0
+        self.ph = PHER_DEPOSIT   # strength of the next pheromone deposit
+        self.tgt = None          # kept target: pool handle, Unit or Building
+        self.tgt_t = 0           # ticks until it is re-evaluated
 
     # ---- movement primitives ----
     def move_towards_point(self, tx, ty):
@@ -202,7 +230,7 @@ class Unit:
 
     def wander(self):
         out_ang = math.atan2(self.y - self.home.y, self.x - self.home.x)
-        self.angle += random.uniform(-0.08, 0.08)
+        self.angle += self.home.rng.uniform(-0.08, 0.08)
         self.angle = (self.angle * (1.0 - OUTWARD_BIAS) + out_ang * OUTWARD_BIAS)
         self.x += math.cos(self.angle)*self.speed*0.9
         self.y += math.sin(self.angle)*self.speed*0.9
@@ -220,7 +248,7 @@ class Unit:
         elif self.y >= HEIGHT - pad:
             self.y = HEIGHT - pad; self.angle = -self.angle; bounced=True
         if bounced:
-            self.angle += random.uniform(-EDGE_BOUNCE_JITTER, EDGE_BOUNCE_JITTER)
+            self.angle += self.home.rng.uniform(-EDGE_BOUNCE_JITTER, EDGE_BOUNCE_JITTER)
 
     def _too_far_from_home(self):
         tether_r = min(WIDTH, HEIGHT) * TETHER_FRAC
@@ -232,6 +260,7 @@ class Unit:
     def _head_home(self):
         self.move_towards_point(self.home.x, self.home.y)
         if self._inside_home():
+            self.ph = PHER_DEPOSIT
             if self.carry_food>0:
                 self.home.stock_food += self.carry_food
                 self.carry_food = 0
@@ -245,28 +274,40 @@ class Unit:
                 self.energy = min(1.0, self.energy + eat * ENERGY_PER_FOOD)
 
     # ---- brain ----
-    def update(self, foods: List[Food], resources: List[Resource],
+    def update(self, foods: ItemPool, resources: ItemPool,
                buildings: List[Building], units: List['Unit']):
+        self.tick_needs()
+        return self.think(foods, resources, buildings, units)
+
+    def tick_needs(self):
         decay = 0.0 if self.role == "reproducer" else ENERGY_DECAY * ROLE_DECAY.get(self.role, ROLE_DECAY["default"])
         self.energy -= decay
         if self.role != "reproducer" and self.energy <= 0:
             self.health -= HEALTH_DECAY_WHEN_STARVING
 
+    def think(self, foods, resources, buildings, units):
+        """Death check + role behaviour for one tick. Returns False if the unit died."""
         if self.health <= 0:
             if self.role == "reproducer":
                 self.home.respawn_q.append((1, "reproducer"))
             else:
                 self.home.respawn_q.append((RESPAWN_TICKS, self.role))
-            if self.carry_food>0: foods.append(Food(self.x, self.y))
+            self._drop_target(foods, resources)
+            if self.carry_food>0: foods.add(self.x, self.y)
+            rng = self.home.rng
+            xs, ys, kinds = [], [], []
             for k,v in self.carry_res.items():
                 for _ in range(v):
-                    resources.append(Resource(self.x+random.randint(-2,2),
-                                              self.y+random.randint(-2,2), k))
+                    xs.append(self.x+rng.randint(-2,2)); ys.append(self.y+rng.randint(-2,2))
+                    kinds.append(RESOURCE_TYPES.index(k))
+            resources.add_many(xs, ys, kinds)
             return False
 
         if self.energy < LOW_ENERGY_HOME:
+            self._drop_target(foods, resources)
             self._head_home(); return True
         if self._too_far_from_home():
+            self._drop_target(foods, resources)
             self.move_towards_point(self.home.x, self.home.y); return True
 
         if self.role == "scavenger":
@@ -282,34 +323,106 @@ class Unit:
 
         return True
 
+    # ---- targets ----
+    def _claim_nearest(self, pool, max_d2=None):
+        """Gatherer target: the claimed item while it exists and the retarget timer runs,
+           else the nearest item nobody else claimed (claimed for us)."""
+        if not TARGET_CLAIMS:
+            return self.nearest(pool, max_d2=max_d2)
+        me = id(self)
+        tgt = self.tgt
+        if tgt is not None:
+            if self.tgt_t > 0 and tgt in pool:
+                self.tgt_t -= 1
+                return tgt
+            pool.release(tgt, me)
+        tgt = pool.nearest(self.x, self.y, max_d2=max_d2, owner=me)
+        if tgt is not None: pool.claim(tgt, me)
+        self.tgt, self.tgt_t = tgt, RETARGET_TICKS
+        return tgt
+
+    def _keep_or_find(self, valid, find):
+        """Fighter target: kept while valid(tgt) and the retarget timer runs, else find()."""
+        tgt = self.tgt
+        if tgt is not None and TARGET_CLAIMS and self.tgt_t > 0 and valid(tgt):
+            self.tgt_t -= 1
+            return tgt
+        tgt = find()
+        self.tgt, self.tgt_t = tgt, RETARGET_TICKS
+        return tgt
+
+    def _drop_target(self, foods, resources):
+        if self.tgt is None: return
+        if self.role == "scavenger":  foods.release(self.tgt, id(self))
+        elif self.role == "builder":  resources.release(self.tgt, id(self))
+        self.tgt = None
+
     # ---- role details ----
     def _pick_waypoint(self):
-        ang = random.uniform(0, 2*math.pi)
-        r   = FORAGE_WAYPOINT_DIST + random.randint(-8, 8)
+        rng = self.home.rng
+        ang = rng.uniform(0, 2*math.pi)
+        r   = FORAGE_WAYPOINT_DIST + rng.randint(-8, 8)
         x   = clamp(self.home.x + math.cos(ang)*r, 4, WIDTH-4)
         y   = clamp(self.home.y + math.sin(ang)*r, 4, HEIGHT-4)
         self.wp = (x, y)
         self.wp_t = FORAGE_TIMEOUT
 
     def _tick_scavenger(self, foods):
+        if self.home.pher is not None:
+            self._forage_by_scent(foods, self.home.pher); return
         if self.carry_food>0:
             self._head_home(); return
-        if foods:
-            tgt = min(foods, key=lambda f: dist2(self.x,self.y,f.x,f.y))
-            self.move_towards_point(tgt.x, tgt.y)
-            if dist2(self.x,self.y,tgt.x,tgt.y) < 16:
+        tgt = self._claim_nearest(foods, _SENSE_D2)
+        if tgt is not None:
+            tx, ty = foods.pos(tgt)
+            self.move_towards_point(tx, ty)
+            if dist2(self.x,self.y,tx,ty) < 16:
                 self.carry_food += 1
-                if tgt in foods: foods.remove(tgt)
+                foods.remove(tgt)
+                self.tgt = None
             return
         if not self.wp or self.wp_t <= 0: self._pick_waypoint()
         self.move_towards_point(self.wp[0], self.wp[1]); self.wp_t -= 1
         if dist2(self.x,self.y,self.wp[0],self.wp[1]) < 20: self._pick_waypoint()
 
+    def _forage_by_scent(self, foods, field):
+        """FORAGE_MODE "pheromone": carriers lay food trail on the way home (up the home
+           trail if there is one); searchers lay home trail, take food they can see, else
+           climb the food trail, else wander to waypoints."""
+        if self.carry_food>0:
+            field.deposit(FOOD_TRAIL, self.team, self.x, self.y, self.ph)
+            self.ph *= PHER_DEPOSIT_DECAY
+            a = field.steer(HOME_TRAIL, self.team, self.x, self.y, self.angle)
+            if a is None or self._inside_home():
+                self._head_home()
+            else:
+                self._step_towards_heading(a)
+            return
+        field.deposit(HOME_TRAIL, self.team, self.x, self.y, self.ph)
+        self.ph *= PHER_DEPOSIT_DECAY
+        tgt = self._claim_nearest(foods, PHER_FOOD_SIGHT*PHER_FOOD_SIGHT)
+        if tgt is not None:
+            tx, ty = foods.pos(tgt)
+            self.move_towards_point(tx, ty)
+            if dist2(self.x,self.y,tx,ty) < 16:
+                self.carry_food += 1
+                self.ph = PHER_DEPOSIT
+                foods.remove(tgt)
+                self.tgt = None
+            return
+        a = field.steer(FOOD_TRAIL, self.team, self.x, self.y, self.angle)
+        if a is not None:
+            self._step_towards_heading(a); return
+        if not self.wp or self.wp_t <= 0: self._pick_waypoint()
+        self.move_towards_point(self.wp[0], self.wp[1]); self.wp_t -= 1
+        if dist2(self.x,self.y,self.wp[0],self.wp[1]) < 20: self._pick_waypoint()
+
+    def _step_towards_heading(self, a):
+        d = PHER_SENSE_DIST
+        self.move_towards_point(self.x + math.cos(a)*d, self.y + math.sin(a)*d)
+
     def _builder_plan(self, buildings):
-        my = [b for b in buildings if b.team==self.team]
-        counts = {"tower":0,"farm":0,"storage":0,"wall":0}
-        for b in my:
-            if b.btype in counts: counts[b.btype]+=1
+        counts = buildings.counts[self.team]   # roster.BuildingList
         if counts["tower"] < MAX_TOWERS: return "tower"
         if counts["farm"]  < MAX_FARMS:  return "farm"
         if counts["storage"]< MAX_STORAGE:return "storage"
@@ -321,37 +434,45 @@ class Unit:
 
     def _tick_builder(self, resources, buildings):
         if any(self.carry_res.values()):
+            self._drop_target(None, resources)
             self._head_home(); return
         plan = self._builder_plan(buildings)
         if plan:
             cost = BUILD_COSTS[plan]
             if not self._has_cost(cost):
-                if resources:
-                    tgt = min(resources, key=lambda r: dist2(self.x,self.y,r.x,r.y))
-                    self.move_towards_point(tgt.x, tgt.y)
-                    if dist2(self.x,self.y,tgt.x,tgt.y) < 16:
-                        self.carry_res[tgt.rtype]+=1
-                        if tgt in resources: resources.remove(tgt)
+                tgt = self._claim_nearest(resources, _SENSE_D2)
+                if tgt is not None:
+                    tx, ty = resources.pos(tgt)
+                    self.move_towards_point(tx, ty)
+                    if dist2(self.x,self.y,tx,ty) < 16:
+                        self.carry_res[RESOURCE_TYPES[resources.kind_of(tgt)]]+=1
+                        resources.remove(tgt)
+                        self.tgt = None
                 else:
                     if not self.wp or self.wp_t <= 0: self._pick_waypoint()
                     self.move_towards_point(self.wp[0], self.wp[1]); self.wp_t -= 1
             else:
-                px = clamp(self.home.x + random.randint(-20,20), 8, WIDTH-8)
-                py = clamp(self.home.y + random.randint(-20,20), 8, HEIGHT-8)
+                self._drop_target(None, resources)   # stock is enough: stop gathering
+                rng = self.home.rng
+                px = clamp(self.home.x + rng.randint(-20,20), 8, WIDTH-8)
+                py = clamp(self.home.y + rng.randint(-20,20), 8, HEIGHT-8)
                 self._pay_cost(cost)
-                buildings.append(Building(px, py, self.team, plan))
+                buildings.append(Building(px, py, self.team, plan, rng=rng, combat=self.home.combat))
                 self.wp = None
         else:
+            self._drop_target(None, resources)       # nothing left to build
             if not self.wp or self.wp_t <= 0: self._pick_waypoint()
             self.move_towards_point(self.wp[0], self.wp[1]); self.wp_t -= 1
 
     def _tick_defender(self, units):
-        enemies = [u for u in units if u.team!=self.team and u.role!="reproducer"]
-        if enemies:
-            tgt = min(enemies, key=lambda e: dist2(self.home.x,self.home.y,e.x,e.y))
+        tgt = self._keep_or_find(lambda u: units.has(u) and u.health > 0,
+                                 lambda: self.home.nearest_enemy(units))
+        if tgt:
             self.move_towards_point(tgt.x, tgt.y)
-            if dist2(self.x,self.y,tgt.x,tgt.y) < 25:
-                tgt.health -= 0.05
+            if self.home.combat is not None:
+                self.home.combat.strike(self, tgt, MELEE_REACH, DEFENDER_DAMAGE)
+            elif dist2(self.x,self.y,tgt.x,tgt.y) < MELEE_REACH*MELEE_REACH:
+                tgt.health -= DEFENDER_DAMAGE
         else:
             ang = math.atan2(self.y-self.home.y, self.x-self.home.x) + 0.1
             rad = HOME_RADIUS + 8
@@ -363,26 +484,31 @@ class Unit:
         if any(self.carry_res.values()):
             self._head_home(); return
 
-        enemy_units = [u for u in units if u.team != self.team and u.role != "reproducer"]
-        if enemy_units:
-            tgt = min(enemy_units, key=lambda e: dist2(self.x,self.y,e.x,e.y))
+        targets = buildings.targets[self.team]   # enemy non-home buildings
+        tgt = self._keep_or_find(
+            lambda t: (units.has(t) and t.health > 0) if isinstance(t, Unit) else targets.has(t),
+            lambda: self.nearest_enemy(units) or self.nearest(targets))
+        combat = self.home.combat
+        if isinstance(tgt, Unit):
             self.move_towards_point(tgt.x, tgt.y)
-            if dist2(self.x,self.y,tgt.x,tgt.y) < 25:
-                tgt.health -= 0.06
+            if combat is not None:
+                combat.strike(self, tgt, MELEE_REACH, ATTACKER_DAMAGE)
+            elif dist2(self.x,self.y,tgt.x,tgt.y) < MELEE_REACH*MELEE_REACH:
+                tgt.health -= ATTACKER_DAMAGE
             return
 
-        targets = [b for b in buildings if b.team != self.team and b.btype != "home"]
-        if targets:
-            tgt = min(targets, key=lambda b: dist2(self.x,self.y,b.x,b.y))
+        if tgt:
             self.move_towards_point(tgt.x, tgt.y)
-            if dist2(self.x,self.y,tgt.x,tgt.y) < 36:
+            if combat is not None:
+                combat.strike(self, tgt, SIEGE_REACH, SIEGE_DAMAGE)   # salvage too
+            elif dist2(self.x,self.y,tgt.x,tgt.y) < SIEGE_REACH*SIEGE_REACH:
                 cost = BUILD_COSTS.get(tgt.btype, {})
                 for k,v in cost.items():
                     salv = max(0, int(round(v * SALVAGE_RATE)))
                     if salv>0: self.carry_res[k] += salv
-                tgt.hp -= 0.08
-                if tgt.hp <= 0 and tgt in buildings:
-                    buildings.remove(tgt)
+                tgt.hp -= SIEGE_DAMAGE
+                if tgt.hp <= 0 and buildings.has(tgt):
+                    buildings.discard(tgt)
             return
 
         if not self.wp or self.wp_t <= 0: self._pick_waypoint()
@@ -0,0 +1,87 @@
+# fakehw.py
+# In-process stand-ins for `spidev` and `RPi.GPIO` so lcd_backend_pi runs on any box
+# (benchmarks, development). install() must run before lcd_backend_pi is imported;
+# spi_transport.SpiTransport also takes the fakes directly.
+#
+# The fakes record what would have gone over the wire: one entry per kernel transfer
+# (ioctl) with its time and size, and every GPIO level change. bus_seconds() turns the
+# transfers into the time a real bus would have needed at max_speed_hz.
+import sys, time, types
+from collections import deque
+
+BUFSIZ = 4096               # spidev's default `bufsiz`: most bytes per transfer
+CALL_OVERHEAD_S = 20e-6     # rough per-ioctl cost on a Pi (syscall + controller setup)
+RECORD_MAX = 100_000        # newest transfers / GPIO events kept
+
+class FakeSpiDev:
+    """Accepts writes and records them; nothing is sent anywhere. Like an old spidev
+       it only has writebytes (see FakeSpiDev2)."""
+
+    def __init__(self, bufsiz=BUFSIZ):
+        self.max_speed_hz = 0
+        self.mode = 0
+        self.bufsiz = bufsiz
+        self.bytes_written = 0
+        self.writes = 0
+        self.transfers = deque(maxlen=RECORD_MAX)   # (perf_counter, nbytes)
+
+    def open(self, bus, dev): pass
+    def close(self): pass
+
+    def _transfer(self, n):
+        if n > self.bufsiz:
+            raise OverflowError(f"Argument list size exceeds {self.bufsiz} bytes.")
+        self.writes += 1
+        self.bytes_written += n
+        self.transfers.append((time.perf_counter(), n))
+
+    def writebytes(self, data):
+        self._transfer(len(data))
+
+    def bus_seconds(self, hz=None):
+        """Modeled wire time of every transfer so far: per-call overhead + 8 bits/byte."""
+        hz = hz or self.max_speed_hz
+        return self.writes * CALL_OVERHEAD_S + self.bytes_written * 8 / hz
+
+class FakeSpiDev2(FakeSpiDev):
+    """spidev >= 3.5: writebytes2 takes any buffer and splits it at bufsiz itself."""
+
+    def writebytes2(self, data):
+        n = len(data) if isinstance(data, (bytes, bytearray, list)) else memoryview(data).nbytes
+        if n <= self.bufsiz:
+            self._transfer(n)
+            return
+        for off in range(0, n, self.bufsiz):
+            self._transfer(min(self.bufsiz, n - off))
+
+class FakeGPIO(types.ModuleType):
+    BCM = 11; OUT = 0; IN = 1
+
+    def __init__(self):
+        super().__init__("RPi.GPIO")
+        self.pins = {}
+        self.outputs = 0                         # output() calls
+        self.events = deque(maxlen=RECORD_MAX)   # (perf_counter, pin, value)
+
+    def setwarnings(self, flag): pass
+    def setmode(self, mode): pass
+    def setup(self, pin, mode): self.pins.setdefault(pin, 0)
+
+    def output(self, pin, value):
+        self.pins[pin] = value
+        self.outputs += 1
+        self.events.append((time.perf_counter(), pin, value))
+
+    def cleanup(self): self.pins.clear()
+
+def install(writebytes2=True):
+    """Register the fakes as `spidev` / `RPi.GPIO` (no-op if already installed).
+       writebytes2=False fakes an old spidev without the buffer call."""
+    if isinstance(sys.modules.get("RPi.GPIO"), FakeGPIO):
+        return
+    spidev = types.ModuleType("spidev")
+    spidev.SpiDev = FakeSpiDev2 if writebytes2 else FakeSpiDev
+    gpio = FakeGPIO()
+    rpi = types.ModuleType("RPi")
+    rpi.GPIO = gpio
+    sys.modules.update({"spidev": spidev, "RPi": rpi, "RPi.GPIO": gpio})
@@ -0,0 +1,94 @@
+# hud.py
+# On-screen text without pygame.font: a built-in 3x5 pixel font (lower case is drawn as
+# upper case), rasterized once into a glyph atlas in the screen's pixel format. Each HUD
+# line lives on its own small colorkeyed surface that remembers its text, and only the
+# character cells that changed since the last frame are re-blitted from the atlas.
+# Per frame the HUD then costs one blit per line; nothing is rasterized and no system
+# fonts are scanned at startup.
+import pygame
+import config as C
+
+# glyph rows top to bottom, one octal digit per row: 4 = left pixel, 2 = middle, 1 = right
+_FONT = {
+    " ": "00000", "0": "75557", "1": "26227", "2": "71747", "3": "71317", "4": "55711",
+    "5": "74717", "6": "74757", "7": "71122", "8": "75757", "9": "75717",
+    "A": "25755", "B": "65656", "C": "34443", "D": "65556", "E": "74647", "F": "74644",
+    "G": "34553", "H": "55755", "I": "72227", "J": "11152", "K": "55655", "L": "44447",
+    "M": "57755", "N": "65555", "O": "25552", "P": "65644", "Q": "25563", "R": "65655",
+    "S": "34216", "T": "72222", "U": "55557", "V": "55552", "W": "55775", "X": "55255",
+    "Y": "55222", "Z": "71247",
+    ":": "02020", ".": "00002", ",": "00024", "-": "00700", "+": "02720", "/": "11244",
+    "%": "51245", "(": "12221", ")": "42224", "=": "07070", "_": "00007", "[": "32223",
+    "]": "62226", "!": "22202", "?": "61202", "'": "22000", "#": "57575", "*": "05250",
+    "<": "12421", ">": "42124",
+}
+GLYPH_W, GLYPH_H = 3, 5
+_CHARS = "".join(_FONT)
+_INDEX = {ch: i for i, ch in enumerate(_CHARS)}
+_KEY = (0, 0, 0)   # transparent; glyphs are never black
+
+def glyph_index(ch):
+    """Atlas cell of a character (unknown characters show as '?')."""
+    i = _INDEX.get(ch)
+    if i is None: i = _INDEX.get(ch.upper(), _INDEX["?"])
+    return i
+
+class Hud:
+    """Text lines stacked from (x, y) in one colour. draw(screen, lines) each frame."""
+
+    def __init__(self, color=(200, 200, 200), scale=C.HUD_FONT_SCALE, pos=(2, 2)):
+        self.color = color
+        self.scale = max(1, int(scale))
+        self.adv = (GLYPH_W + 1) * self.scale        # cell width (1px gap)
+        self.line_h = (GLYPH_H + 2) * self.scale
+        self.pos = pos
+        self._atlas = None
+        self._fmt = None     # (bitsize, masks) the atlas and lines were built for
+        self._lines = []     # [surface, text shown]
+        self.glyph_blits = 0 # cells redrawn so far (lifetime)
+
+    def _build(self, screen):
+        s = self.scale
+        atlas = pygame.Surface((self.adv * len(_CHARS), self.line_h), 0, screen)
+        atlas.fill(_KEY)
+        for i, ch in enumerate(_CHARS):
+            for row, bits in enumerate(_FONT[ch]):
+                bits = int(bits)
+                for col in range(GLYPH_W):
+                    if bits & (4 >> col):
+                        atlas.fill(self.color, (i*self.adv + col*s, s + row*s, s, s))
+        self._atlas = atlas
+        self._fmt = (screen.get_bitsize(), screen.get_masks())
+        self._lines = []
+
+    def _line(self, screen, k):
+        while len(self._lines) <= k:
+            surf = pygame.Surface((screen.get_width(), self.line_h), 0, screen)
+            surf.fill(_KEY)
+            surf.set_colorkey(_KEY)
+            self._lines.append([surf, ""])
+        return self._lines[k]
+
+    def _set(self, rec, text):
+        surf, old = rec
+        n = surf.get_width() // self.adv
+        text = text[:n]
+        adv, h, atlas = self.adv, self.line_h, self._atlas
+        blits = []
+        for i in range(max(len(text), len(old))):
+            ch = text[i] if i < len(text) else " "
+            if ch == (old[i] if i < len(old) else " "): continue
+            blits.append((atlas, (i*adv, 0), (glyph_index(ch)*adv, 0, adv, h)))
+        if blits:
+            surf.blits(blits, doreturn=False)
+            self.glyph_blits += len(blits)
+        rec[1] = text
+
+    def draw(self, screen, lines):
+        if self._fmt != (screen.get_bitsize(), screen.get_masks()):
+            self._build(screen)
+        x, y = self.pos
+        for k, text in enumerate(lines):
+            rec = self._line(screen, k)
+            if text != rec[1]: self._set(rec, text)
+            screen.blit(rec[0], (x, y + k*self.line_h))
@@ -12,4 +12,4 @@ def get_lcd():
         from lcd_backend_sim import LCDSim
         return LCDSim()
 
-W, H = C.WIDTH, C.HEIGHT
+W, H = C.PANEL_W, C.PANEL_H
@@ -1,8 +1,10 @@
 import time, numpy as np, spidev
 import RPi.GPIO as G
 import config as C
+from lcd_dirty import dirty_rects
+from spi_transport import SpiTransport
 
-W, H = C.WIDTH, C.HEIGHT
+W, H = C.PANEL_W, C.PANEL_H
 RST, DC, BL = 27, 25, 24
 
 class LCDPi:
@@ -13,42 +15,77 @@ class LCDPi:
             G.setup(p, G.OUT)
         G.output(BL, 1)
         self.spi = spidev.SpiDev(); self.spi.open(0,0); self.spi.max_speed_hz = C.SPI_HZ
-        self._cmd(0x11); time.sleep(0.12)
-        self._cmd(0x36, [C.M])
-        self._cmd(0x3A, [0x05])
-        self._cmd(0x29)
+        self.bus = SpiTransport(self.spi, G, DC)
+        self._prev = None   # last frame sent, (H, W, 2) panel byte order
+        self._prev_fb = np.zeros((H, W), dtype=">u2")   # same, for push_bgr565
+        self._fb_sent = False
+        self._scratch = np.empty(H * W * 2, np.uint8)   # packed rows of a partial-width rect
+        self.bus.command(0x11); time.sleep(0.12)
+        self.bus.commands([(0x36, bytes([C.M])), (0x3A, b"\x05"), (0x29, None)])
 
-    def _write_chunked(self, b):
-        for i in range(0, len(b), 4096):
-            self.spi.writebytes(b[i:i+4096])
-
-    def _cmd(self, v, data=None):
-        G.output(DC,0); self.spi.writebytes([v])
-        if data is not None:
-            G.output(DC,1); self._write_chunked(bytearray(data))
+    def _window(self, x0, y0, x1, y1):
+        self.bus.window(x0+C.X0, y0+C.Y0, x1+C.X0, y1+C.Y0)
 
     def _window_full(self):
-        G.output(DC,0); self.spi.writebytes([0x2A])
-        G.output(DC,1); self._write_chunked(bytearray([0,0+C.X0, 0,(W-1)+C.X0]))
-        G.output(DC,0); self.spi.writebytes([0x2B])
-        G.output(DC,1); self._write_chunked(bytearray([0,0+C.Y0, 0,(H-1)+C.Y0]))
-        G.output(DC,0); self.spi.writebytes([0x2C])
+        self._window(0, 0, W-1, H-1)
+
+    def _send_rect(self, raw, x0, y0, x1, y1):
+        """Window + pixels of one rect of `raw` ((H, W*2) bytes). Full-width rects are
+           contiguous rows of the frame and go out as-is; others are packed into the
+           reusable scratch buffer first."""
+        self._window(x0, y0, x1, y1)
+        rows = raw[y0:y1+1]
+        if x0 == 0 and x1 == W-1:
+            self.bus.write(rows)
+            return
+        w2 = (x1 - x0 + 1) * 2
+        packed = self._scratch[:rows.shape[0] * w2].reshape(rows.shape[0], w2)
+        np.copyto(packed, rows[:, x0*2:x0*2 + w2])
+        self.bus.write(packed)
 
     @staticmethod
-    def rgb_to_bgr565_bytes(img_np):
+    def rgb_to_bgr565(img_np):
+        """(H, W, 3) RGB888 -> (H, W, 2) uint8 BGR565, high byte first (panel order)."""
         r = img_np[...,0]; g = img_np[...,1]; b = img_np[...,2]
         r, b = b, r
         v = ((r & 0xF8).astype(np.uint16) << 8) | ((g & 0xFC).astype(np.uint16) << 3) | (b.astype(np.uint16) >> 3)
         hi = (v >> 8).astype(np.uint8); lo = (v & 0xFF).astype(np.uint8)
-        out = np.empty((img_np.shape[0], img_np.shape[1]*2), dtype=np.uint8)
-        out[:,0::2], out[:,1::2] = hi, lo
-        return out.ravel().tobytes()
+        out = np.empty((img_np.shape[0], img_np.shape[1], 2), dtype=np.uint8)
+        out[...,0], out[...,1] = hi, lo
+        return out
+
+    @staticmethod
+    def rgb_to_bgr565_bytes(img_np):
+        return LCDPi.rgb_to_bgr565(img_np).tobytes()
 
     def push_numpy_rgb(self, img_np):
         assert img_np.shape[0]==H and img_np.shape[1]==W and img_np.shape[2]==3
-        self._window_full()
-        G.output(DC,1)
-        self._write_chunked(self.rgb_to_bgr565_bytes(img_np))
+        frame = self.rgb_to_bgr565(img_np)
+        rects = None if self._prev is None else dirty_rects(self._prev, frame)
+        if rects is None:
+            self._window_full()
+            self.bus.write(frame)
+        else:
+            # only what changed, one CASET/RASET window per rect
+            raw = frame.reshape(H, W*2)
+            for x0, y0, x1, y1 in rects:
+                self._send_rect(raw, x0, y0, x1, y1)
+        self._prev = frame
+
+    def push_bgr565(self, fb):
+        """Send an (H, W) '>u2' BGR565 framebuffer as-is (already panel byte order).
+           No colour conversion and no per-frame allocation: full frames go out as a
+           memoryview of `fb` itself."""
+        rects = dirty_rects(self._prev_fb, fb) if self._fb_sent else None
+        raw = fb.view(np.uint8).reshape(H, W*2)
+        if rects is None:
+            self._window_full()
+            self.bus.write(raw)
+        else:
+            for x0, y0, x1, y1 in rects:
+                self._send_rect(raw, x0, y0, x1, y1)
+        np.copyto(self._prev_fb, fb)
+        self._fb_sent = True
 
     def close(self):
         try: G.cleanup()
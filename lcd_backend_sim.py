@@ -1,88 +1,117 @@
-import time, spidev, RPi.GPIO as G
-import numpy as np
-from config import WIDTH, HEIGHT, LCD_RST, LCD_DC, LCD_BL, SPI_BUS, SPI_DEV, SPI_HZ, MADCTL, XOFF, YOFF
+# lcd_backend_sim.py
+# Stand-in for the SPI panel on any machine. LCDSim keeps what the panel would show and
+#   - shows it in a SCALE-times window titled WINDOW_TITLE (or nothing with SIM_HEADLESS,
+#     or when used as the fallback without SIM: video then runs on SDL's dummy driver);
+#   - models the SPI traffic: every push goes through the same dirty-rect choice and
+#     spi_transport.SpiTransport as LCDPi, over fakehw's recording spidev at SPI_HZ, so
+#     stats() gives the bytes, transfers and bus time the real panel would cost
+#     (SIM_SPI_PACE also makes each push take that long);
+#   - optionally captures every pushed frame to SIM_CAPTURE, a preallocated memory-mapped
+#     file of raw panel bytes (bgr565be, H*W*2 per frame), trimmed on close().
+import os, time, numpy as np
+import config as C
+import fakehw
+from lcd_dirty import dirty_rects
+from spi_transport import SpiTransport
 
-class LCDBackend:
-    def __init__(self, w=WIDTH, h=HEIGHT):
-        self.W, self.H = w, h
+W, H = C.PANEL_W, C.PANEL_H
+_DC = 25   # pin number only labels the fake GPIO's events
 
-        # SPI
-        self.spi = spidev.SpiDev()
-        self.spi.open(SPI_BUS, SPI_DEV)
-        self.spi.max_speed_hz = SPI_HZ
-        self.spi.mode = 0
+def rgb_to_bgr565(img_np):
+    """(H, W, 3) RGB888 -> (H, W) '>u2' BGR565, the bytes LCDPi would send."""
+    r = img_np[...,0].astype(np.uint16); g = img_np[...,1].astype(np.uint16)
+    b = img_np[...,2].astype(np.uint16)
+    return (((b & 0xF8) << 8) | ((g & 0xFC) << 3) | (r >> 3)).astype(">u2")
 
-        # GPIO
-        G.setwarnings(False)
-        G.setmode(G.BCM)
-        for pin in (LCD_RST, LCD_DC, LCD_BL):
-            G.setup(pin, G.OUT)
-        G.output(LCD_BL, 1)
+class LCDSim:
+    def __init__(self, headless=None, capture=None):
+        self.headless = (C.SIM_HEADLESS or not C.SIM) if headless is None else headless
+        self.spi = fakehw.FakeSpiDev2(); self.spi.max_speed_hz = C.SPI_HZ
+        self.bus = SpiTransport(self.spi, fakehw.FakeGPIO(), _DC)
+        self._fb = np.zeros((H, W), dtype=">u2")   # panel contents
+        self._sent = False
+        self._zeros = memoryview(bytes(W * H * 2))  # stand-in pixel data for the model
+        self.frames = 0
+        self._window = None
+        if not self.headless:
+            import pygame
+            self._window = pygame.display.set_mode((W * C.SCALE, H * C.SCALE))
+            pygame.display.set_caption(C.WINDOW_TITLE)
+            masks = (0x001F, 0x07E0, 0xF800, 0)    # BGR565, as lcd_present's native surface
+            self._small = pygame.Surface((W, H), 0, 16, masks)
+            self._big = pygame.Surface(self._window.get_size(), 0, 16, masks)
+        self._cap = None
+        self._cap_path = C.SIM_CAPTURE if capture is None else capture
+        if self._cap_path:
+            self._cap = np.memmap(self._cap_path, dtype=">u2", mode="w+",
+                                  shape=(C.SIM_CAPTURE_FRAMES, H, W))
+        self._cap_n = 0
+        self._cap_full = False
 
-        self._reset()
-        self._init_panel()
+    # ----------------- SPI model -----------------
+    def _model(self, rects):
+        """Send what LCDPi would for `rects` (None = full frame) through the fake bus.
+           Returns the modeled bus seconds."""
+        before = self.spi.bus_seconds()
+        if rects is None:
+            rects = [(0, 0, W-1, H-1)]
+        for x0, y0, x1, y1 in rects:
+            self.bus.window(x0+C.X0, y0+C.Y0, x1+C.X0, y1+C.Y0)
+            self.bus.write(self._zeros[:(x1 - x0 + 1) * (y1 - y0 + 1) * 2])
+        return self.spi.bus_seconds() - before
 
-    def _c(self, val):
-        G.output(LCD_DC, 0)
-        self.spi.writebytes([val & 0xFF])
+    def stats(self):
+        """Modeled panel cost of everything pushed so far."""
+        n = max(1, self.frames)
+        bus = self.spi.bus_seconds()
+        return {"frames": self.frames, "bytes_per_frame": self.spi.bytes_written / n,
+                "transfers_per_frame": self.spi.writes / n,
+                "bus_ms_per_frame": bus * 1e3 / n,
+                "max_fps": self.frames / bus if bus else None}
 
-    def _d(self, data):
-        G.output(LCD_DC, 1)
-        if isinstance(data, (bytes, bytearray)):
-            for i in range(0, len(data), 4096):
-                self.spi.writebytes(data[i:i+4096])
-        else:
-            buf = bytes(data) if not isinstance(data, (bytes, bytearray)) else data
-            for i in range(0, len(buf), 4096):
-                self.spi.writebytes(buf[i:i+4096])
+    # ----------------- pushes -----------------
+    def push_numpy_rgb(self, img_np):
+        assert img_np.shape[0]==H and img_np.shape[1]==W and img_np.shape[2]==3
+        self.push_bgr565(rgb_to_bgr565(img_np))
 
-    def _reset(self):
-        G.output(LCD_RST, 1); time.sleep(0.01)
-        G.output(LCD_RST, 0); time.sleep(0.01)
-        G.output(LCD_RST, 1); time.sleep(0.12)
+    def push_bgr565(self, fb):
+        """(H, W) '>u2' BGR565 framebuffer in panel byte order, as for LCDPi."""
+        t0 = time.perf_counter()
+        rects = dirty_rects(self._fb, fb) if self._sent else None
+        bus_s = self._model(rects)
+        np.copyto(self._fb, fb)
+        self._sent = True
+        self.frames += 1
+        if self._cap is not None: self._capture()
+        if self._window is not None: self._show()
+        if C.SIM_SPI_PACE:
+            rest = bus_s - (time.perf_counter() - t0)
+            if rest > 0: time.sleep(rest)
 
-    def _init_panel(self):
-        self._c(0x11); time.sleep(0.12)         # Sleep out
-        self._c(0x36); self._d([MADCTL])        # MADCTL (rotation / BGR)
-        self._c(0x3A); self._d([0x05])          # 16-bit color
-        # Address window full screen (with panel offsets)
-        self._c(0x2A); self._d([0, XOFF, 0, XOFF + self.W - 1])
-        self._c(0x2B); self._d([0, YOFF, 0, YOFF + self.H - 1])
-        self._c(0x29)                           # Display on
+    def _capture(self):
+        if self._cap_n < len(self._cap):
+            self._cap[self._cap_n] = self._fb
+            self._cap_n += 1
+        elif not self._cap_full:
+            print(f"[lcd] sim capture full ({self._cap_n} frames), not recording more")
+            self._cap_full = True
 
-    def blit_surface(self, surface):
-        """Convert a pygame Surface (WIDTH x HEIGHT) to RGB565 and push."""
+    def _show(self):
         import pygame
-        rgb_bytes = pygame.image.tostring(surface, "RGB")  # row-major RGB888
-        arr = np.frombuffer(rgb_bytes, dtype=np.uint8).reshape((HEIGHT, WIDTH, 3))
-
-        # Convert to RGB565
-        r = arr[:, :, 0].astype(np.uint16)
-        g = arr[:, :, 1].astype(np.uint16)
-        b = arr[:, :, 2].astype(np.uint16)
-        rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-
-        # Interleave MSB/LSB into a flat buffer
-        hi = (rgb565 >> 8).astype(np.uint8).ravel()
-        lo = (rgb565 & 0xFF).astype(np.uint8).ravel()
-        out = np.empty(self.W * self.H * 2, dtype=np.uint8)
-        out[0::2] = hi
-        out[1::2] = lo
-
-        self._c(0x2C)           # RAM write
-        self._d(out.tobytes())  # chunked inside _d
+        px = pygame.surfarray.pixels2d(self._small)   # (W, H) view, native byte order
+        np.copyto(px, self._fb.T)
+        del px
+        pygame.transform.scale(self._small, self._big.get_size(), self._big)
+        self._window.blit(self._big, (0, 0))
+        pygame.display.flip()
 
     def close(self):
-        try:
-            self._c(0x28)  # display off
-        except Exception:
-            pass
-        try:
-            G.output(LCD_BL, 0)
-            G.cleanup()
-        except Exception:
-            pass
-        try:
-            self.spi.close()
-        except Exception:
-            pass
+        if self._cap is not None:
+            n = self._cap_n
+            self._cap.flush()
+            self._cap = None   # drop the mapping before trimming the file
+            os.truncate(self._cap_path, n * H * W * 2)
+        s = self.stats()
+        if s["frames"]:
+            print(f"[lcd] sim: {s['frames']} frames, {s['bytes_per_frame']:.0f} B/frame, "
+                  f"SPI {s['bus_ms_per_frame']:.2f} ms/frame at {C.SPI_HZ/1e6:g} MHz")
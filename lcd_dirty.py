@@ -0,0 +1,64 @@
+# lcd_dirty.py
+# Work out which rectangles of the panel changed between two frames and whether
+# pushing just those beats a full-frame push. Pure numpy, so it runs off-Pi too.
+import numpy as np
+
+# Fixed cost of one CASET/RASET/RAMWR window, in "pixel bytes" at the SPI clock:
+# 3 command bytes + 8 address bytes, 4 DC flips and ~5 spidev syscalls.
+RECT_COST = 128
+
+def rect_cost(x0, y0, x1, y1):
+    return RECT_COST + (x1 - x0 + 1) * (y1 - y0 + 1) * 2
+
+def dirty_rects(prev, cur):
+    """prev/cur: (H, W) uint16 or (H, W, 2) uint8 panel frames. Returns a list of inclusive
+       (x0, y0, x1, y1) rects covering every changed pixel, or None if one full-frame
+       push is cheaper. [] means nothing changed."""
+    H, W = cur.shape[:2]
+    changed = prev != cur
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not rows.size:
+        return []
+
+    # 1) runs of changed rows, merged while one taller band is cheaper than two
+    bands = []
+    start = prev_r = int(rows[0])
+    for r in rows[1:]:
+        r = int(r)
+        if r != prev_r + 1:
+            bands.append([start, prev_r]); start = r
+        prev_r = r
+    bands.append([start, prev_r])
+
+    def band_cols(y0, y1):
+        cols = np.flatnonzero(changed[y0:y1+1].any(axis=0))
+        return int(cols[0]), int(cols[-1])
+
+    merged = [bands[0] + list(band_cols(*bands[0]))]
+    for y0, y1 in bands[1:]:
+        x0, x1 = band_cols(y0, y1)
+        py0, py1, px0, px1 = merged[-1]
+        mx0, mx1 = min(x0, px0), max(x1, px1)
+        if rect_cost(mx0, py0, mx1, y1) <= rect_cost(px0, py0, px1, py1) + rect_cost(x0, y0, x1, y1):
+            merged[-1] = [py0, y1, mx0, mx1]
+        else:
+            merged.append([y0, y1, x0, x1])
+
+    # 2) inside each band, split far-apart column clusters (e.g. two homes' worth of ants)
+    rects = []
+    for y0, y1, bx0, bx1 in merged:
+        h = y1 - y0 + 1
+        cols = np.flatnonzero(changed[y0:y1+1, bx0:bx1+1].any(axis=0)) + bx0
+        x0 = prev_c = int(cols[0])
+        for c in cols[1:]:
+            c = int(c)
+            if (c - prev_c - 1) * h * 2 > RECT_COST:
+                rects.append((x0, y0, prev_c, y1)); x0 = c
+            prev_c = c
+        rects.append((x0, y0, prev_c, y1))
+
+    if sum(rect_cost(*r) for r in rects) >= rect_cost(0, 0, W - 1, H - 1):
+        return None
+    return rects
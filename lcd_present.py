@@ -1,36 +1,77 @@
 # lcd_present.py
+# Offscreen drawing surface + push to the panel. Nothing happens at import: init() (or
+# the first surface() / present() call) starts only pygame's video subsystem, with the
+# dummy driver unless SIM wants a window, and opens the LCD backend or the display process.
 import os, numpy as np, pygame
 import config as C
 from lcd import get_lcd, W, H  # uses your SIM flag and returns LCDPi or LCDSim
 
-# If we are pushing to the real LCD, avoid opening a pygame window for the offscreen surface.
-if not C.SIM:
-    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+_lcd = None
+_display = None
+_surface = None
+_fb = None
+_native = False
 
-pygame.init()
-_surface = pygame.Surface((W, H))
-_lcd = get_lcd()
+def init():
+    """Set up video + panel once; later calls do nothing."""
+    global _lcd, _display, _surface, _fb, _native
+    if _surface is not None: return
+    # If we are pushing to the real LCD, avoid opening a pygame window for the offscreen surface.
+    if not C.SIM:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()   # events + surfaces; no audio/joystick/font start-up cost
+    if C.DISPLAY_PROCESS:
+        # the display process owns the LCD; we only publish frames into shared memory
+        from display_proc import DisplayProcess
+        _display = DisplayProcess(W, H)
+    else:
+        _lcd = get_lcd()
+
+    # Backends that take BGR565 directly get a 16-bit surface whose pixel layout already is
+    # the panel's (blue in the high bits, red in the low bits). present() then only
+    # byte-swaps into a persistent big-endian buffer; there is no RGB888 round trip.
+    _native = _display is not None or hasattr(_lcd, "push_bgr565")
+    if _native:
+        _surface = pygame.Surface((W, H), 0, 16, (0x001F, 0x07E0, 0xF800, 0))
+        _fb = np.zeros((H, W), dtype=">u2")
+    else:
+        _surface = pygame.Surface((W, H))
 
 def surface():
     """Get the offscreen pygame Surface you should draw onto each frame."""
+    init()
     return _surface
 
 def present():
-    """Convert the current Surface to HxWx3 RGB and push via your backends."""
+    """Push the current Surface via your backends."""
+    init()
+    if _native:
+        px = pygame.surfarray.pixels2d(_surface)   # (W, H) uint16 view, no copy
+        if _display is not None:
+            _display.publish(px.T)                 # never blocks on the panel
+            del px
+            return
+        np.copyto(_fb, px.T)                       # native -> panel byte order
+        del px                                     # unlock the surface for drawing
+        _lcd.push_bgr565(_fb)
+        return
     # Convert to contiguous RGB888 -> (H, W, 3) uint8
     rgb_bytes = pygame.image.tostring(_surface, "RGB")
     arr = np.frombuffer(rgb_bytes, dtype=np.uint8).reshape((H, W, 3))
     _lcd.push_numpy_rgb(arr)
 
 def close():
+    global _lcd, _display, _surface
     try:
         pygame.quit()
     except:
         pass
     try:
-        _lcd.close()
+        if _display is not None: _display.close()
+        elif _lcd is not None: _lcd.close()
     except:
         pass
+    _lcd = _display = _surface = None
 
 if __name__ == "__main__":
     # quick smoke test: moving gradient so you can verify orientation & size
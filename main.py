@@ -1,187 +1,171 @@
 # main.py
-import random, pygame
-from typing import List
+import argparse, os, struct, time, pygame
 import config as C
-from entities import Unit, Building, Food, Resource
-import meta
-
-# bridge that gives us an offscreen Surface and pushes to LCD (or SIM window)
-from lcd_present import surface, present, close
-
-# Offscreen render target (HxW) — draw to this exactly like a normal pygame Surface.
-screen = surface()
-clock  = pygame.time.Clock()
-try:
-    font = pygame.font.SysFont("consolas", 12)
-except Exception:
-    font = pygame.font.Font(None, 12)
-
-# --- world state ---
-buildings: List[Building] = []
-units:     List[Unit]     = []
-foods:     List[Food]     = []
-resources: List[Resource] = []
-tick      = 0
-round_id  = 0
-
-# --- learning state ---
-meta_state = meta.load_meta()
-C.ROLE_WEIGHTS = meta_state["role_weights"]  # keep per-team weights in sync
-
-# ----------------- world setup -----------------
-def spawn_initial_world():
-    global buildings, units, foods, resources, tick
-    buildings, units, foods, resources = [], [], [], []
-    tick = 0
-
-    homes=[]
-    margin = 16 if min(C.WIDTH, C.HEIGHT) <= 128 else 24
-    for t in range(C.NUM_TEAMS):
-        hx = margin if t == 0 else C.WIDTH - margin
-        hy = C.HEIGHT // 2
-        b = Building(hx, hy, t, "home")
-        buildings.append(b)
-        homes.append(b)
-
-    # starting population
-    for t, home in enumerate(homes):
-        for role, n in C.START_UNITS.items():
-            for _ in range(n):
-                units.append(Unit(home.x, home.y, t, role, home))
-
-    # scatter initial food/resources
-    for _ in range(C.MAX_FOOD):
-        foods.append(Food(random.randint(6, C.WIDTH-6), random.randint(6, C.HEIGHT-6)))
-    for _ in range(C.MAX_RESOURCES):
-        rtype = random.choice(C.RESOURCE_TYPES)
-        resources.append(Resource(random.randint(6, C.WIDTH-6), random.randint(6, C.HEIGHT-6), rtype))
-
-def spawn_food_and_resources():
-    # light, probabilistic respawn each frame
-    if len(foods) < C.MAX_FOOD and random.random() < C.FOOD_RESPAWN_CHANCE / C.FPS:
-        foods.append(Food(random.randint(6, C.WIDTH-6), random.randint(6, C.HEIGHT-6)))
-    if len(resources) < C.MAX_RESOURCES and random.random() < C.RES_RESPAWN_CHANCE / C.FPS:
-        rtype = random.choice(C.RESOURCE_TYPES)
-        resources.append(Resource(random.randint(6, C.WIDTH-6), random.randint(6, C.HEIGHT-6), rtype))
-
-def survivors_nonrepro_count():
-    counts = [0]*C.NUM_TEAMS
-    for u in units:
-        if u.role != "reproducer":
-            counts[u.team] += 1
-    return counts
-
-def survivors_by_role():
-    # [team][scav,builder,defender,attacker]
-    role_ix = {"scavenger":0,"builder":1,"defender":2,"attacker":3}
-    data = [[0,0,0,0] for _ in range(C.NUM_TEAMS)]
-    for u in units:
-        if u.role == "reproducer": continue
-        data[u.team][ role_ix.get(u.role,0) ] += 1
-    return data
-
-def ensure_reproducer_exists():
-    """Guarantee each team always has a reproducer (spawns free at home if missing)."""
-    for t in range(C.NUM_TEAMS):
-        home = next((b for b in buildings if b.team==t and b.btype=="home"), None)
-        if not home: continue
-        has_repro = any(u for u in units if u.team==t and u.role=="reproducer")
-        in_queue  = any(role=="reproducer" for _,role in home.respawn_q)
-        if not has_repro and not in_queue:
-            home.respawn_q.append((1,"reproducer"))
-
-def end_round_and_restart(winner):
-    """Persist tiny 'learning' for role weights and restart the world."""
-    global round_id, meta_state
-    surv_roles = survivors_by_role()
-    meta_state = meta.update_after_round(meta_state, winner, surv_roles)
-    meta.save_meta(meta_state)
-    C.ROLE_WEIGHTS = meta_state["role_weights"]
-    round_id += 1
-    spawn_initial_world()
-
-def reproduction_tick():
-    """Reproducer attempts to spawn one unit per second (if base has food, pop cap not reached)."""
-    pops = [0]*C.NUM_TEAMS
-    for u in units:
-        if u.role != "reproducer":
-            pops[u.team] += 1
-
-    for t in range(C.NUM_TEAMS):
-        if pops[t] >= C.MAX_TEAM_POP: continue
-        home = next((b for b in buildings if b.team==t and b.btype=="home"), None)
-        if not home: continue
-        if tick % C.FPS != 0: continue   # ~1Hz
-        if home.stock_food < C.REPRODUCE_FOOD_COST: continue
-
-        weights = C.ROLE_WEIGHTS[t]  # [scav, builder, defender, attacker]
-        roles = ["scavenger","builder","defender","attacker"]
-        role  = random.choices(roles, weights=weights, k=1)[0]
-        home.stock_food -= C.REPRODUCE_FOOD_COST
-        units.append(Unit(home.x, home.y, t, role, home))
+import checkpoint
+from world import new_world
+from render import Renderer
+from hud import Hud
+from camera import camera_for
+from scheduler import FixedStep
 
 # ----------------- rendering -----------------
-def draw_world():
-    screen.fill((0,0,0))
-    for r in resources: r.draw(screen)
-    for f in foods:     f.draw(screen)
-    for b in buildings: b.draw(screen)
-    for u in units:     u.draw(screen)
+_renderer = Renderer(camera_for())   # camera only when the world is bigger than the panel
+_hud = Hud()                         # built-in bitmap font, redraws changed characters only
+
+def draw_world(world, screen, prof=None):
+    _renderer.draw(world, screen)
 
     # Tiny HUD (top-left)
-    sr = survivors_nonrepro_count()
-    hud = f"Rd {round_id} t:{tick}  A:{sr[0]} B:{sr[1]}"
-    screen.blit(font.render(hud, True, (200,200,200)), (2,2))
+    sr = world.survivors_nonrepro_count()
+    lines = [f"Rd {world.round_id} t:{world.tick}  " + " ".join(f"{chr(65 + t)}:{c}" for t, c in enumerate(sr))]
+    if prof is not None and C.PROFILE_HUD:
+        lines.append(prof.hud_line())
+    _hud.draw(screen, lines)
 
 # ----------------- main loop -----------------
-def main():
-    spawn_initial_world()
+def _open_replay(path):
+    if not path: return None
+    from replay import ReplayLog
+    try:
+        return ReplayLog(path)
+    except ValueError as e:
+        raise SystemExit(f"[replay] {e}; record to a new file")
+
+def _make_profiler(on):
+    if not (on or C.PROFILE): return None
+    from profiler import PhaseProfiler
+    return PhaseProfiler()
+
+def _start(world, resume, path=C.CHECKPOINT_FILE):
+    """Continue the checkpointed round with --resume (when there is a usable checkpoint),
+       else start a fresh one."""
+    if resume and os.path.exists(path):
+        try:
+            checkpoint.load(world, path)
+            print(f"[checkpoint] resumed round {world.round_id} at tick {world.tick}")
+            return
+        except (OSError, ValueError, struct.error, IndexError) as e:
+            print("[checkpoint] starting fresh:", e)
+    world.spawn_initial_world()
+
+class _Checkpoints:
+    """Saves a checkpoint every CHECKPOINT_SECS of real time and whenever a round ended.
+       path=None never saves."""
+    def __init__(self, path=C.CHECKPOINT_FILE):
+        self.path = path
+        self.next = time.monotonic() + C.CHECKPOINT_SECS
+
+    def maybe_save(self, world, ended):
+        if not C.CHECKPOINT_SECS or self.path is None: return
+        now = time.monotonic()
+        if not ended and now < self.next: return
+        self.next = now + C.CHECKPOINT_SECS
+        try:
+            checkpoint.save(world, self.path)
+        except OSError as e:
+            print("[checkpoint] save failed:", e)
+
+def main(seed=None, replay_path=None, profile=False, resume=False, checkpoint_path=None):
+    # bridge that gives us an offscreen Surface and pushes to LCD (or SIM window)
+    import lcd_present
+    from lcd_present import surface, present, close
+    lcd_present.init()
+
+    # Offscreen render target (HxW) — draw to this exactly like a normal pygame Surface.
+    screen = surface()
+    sched  = FixedStep()   # fixed-timestep sim, independent render rate (scheduler.py)
+
+    world = new_world(seed=seed, replay=_open_replay(replay_path))
+    ckpt_path = checkpoint_path or C.CHECKPOINT_FILE
+    _start(world, resume, ckpt_path)
+    world.prof = prof = _make_profiler(profile)
+    ckpt = _Checkpoints(ckpt_path)
     running = True
-    global tick
 
     while running:
-        dt = clock.tick(C.FPS)
-        tick += 1
+        if prof: prof.begin()
 
         # even in SIM, let pygame pump the event queue
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
                 running = False
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_c and _renderer.camera:
+                _renderer.camera.toggle()   # overview <-> follow (SIM window)
+        if prof: prof.mark("events")
 
-        spawn_food_and_resources()
-
-        # buildings update
-        for b in list(buildings):
-            allies  = [u for u in units if u.team==b.team]
-            enemies = [u for u in units if u.team!=b.team and u.role!="reproducer"]
-            b.update(allies, enemies, buildings, foods)
-
-        ensure_reproducer_exists()
-        reproduction_tick()
-
-        # units update (remove dead)
-        alive=[]
-        for u in units:
-            if u.update(foods, resources, buildings, units):
-                alive.append(u)
-        units[:] = alive
-
-        # round end / restart logic
-        sr = survivors_nonrepro_count()
-        alive_teams = [i for i,c in enumerate(sr) if c>0]
-        if len(alive_teams) == 1:
-            end_round_and_restart(alive_teams[0])
-        elif len(alive_teams) == 0 and tick > C.FPS*8:
-            end_round_and_restart(None)
-        elif tick >= C.ROUND_MAX_TICKS:
-            winner = 0 if sr[0] > sr[1] else 1 if sr[1] > sr[0] else None
-            end_round_and_restart(winner)
+        steps = sched.advance()
+        ended = False
+        for _ in range(steps):
+            ended = world.step() or ended
+        ckpt.maybe_save(world, ended)
+        if prof: prof.mark("checkpoint")
 
         # draw & present to LCD or SIM window
-        draw_world()
-        present()
-
+        drew = sched.render_due()
+        if drew:
+            draw_world(world, screen, prof)
+            if prof: prof.mark("draw")
+            present()
+            if prof: prof.mark("present")
+        if prof and (steps or drew):   # idle passes aren't frames
+            prof.end()
+            prof.maybe_report()
+        sched.sleep()
+
+    ckpt.maybe_save(world, True)   # last state on a clean exit too
     close()
 
+def run_headless(rounds, report_every=50, seed=None, replay_path=None, profile=False, resume=False,
+                 checkpoint_path=None):
+    """Step the world as fast as the CPU allows: no clock, display, fonts or LCD.
+       Learning still goes through meta.update_after_round; meta.record_round appends
+       every round to META_LOG and rewrites META_FILE every META_SNAPSHOT_ROUNDS rounds.
+       Checkpoints only with --resume or --checkpoint, so a fast-forward run never
+       overwrites the display app's colony."""
+    world = new_world(seed=seed, replay=_open_replay(replay_path))
+    ckpt_path = checkpoint_path or (C.CHECKPOINT_FILE if resume else None)
+    _start(world, resume, ckpt_path)
+    world.prof = prof = _make_profiler(profile)
+    ckpt = _Checkpoints(ckpt_path)
+    t0 = time.perf_counter()
+    ticks = 0
+    wins = [0]*C.NUM_TEAMS; draws = 0
+    while world.round_id < rounds:
+        ticks += 1
+        if prof: prof.begin()
+        ended = world.step()
+        ckpt.maybe_save(world, ended)
+        if prof:
+            prof.mark("checkpoint")
+            prof.end()
+            prof.maybe_report()
+        if ended:
+            if world.last_winner is None: draws += 1
+            else: wins[world.last_winner] += 1
+            if world.round_id % report_every == 0 or world.round_id == rounds:
+                el = time.perf_counter() - t0
+                print(f"[headless] rounds {world.round_id}/{rounds}  wins {wins} draws {draws}  "
+                      f"{ticks/el:.0f} ticks/s  weights {world.meta_state['role_weights']}")
+    return world.meta_state
+
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Ant colony")
+    ap.add_argument("--headless", action="store_true",
+                    help="no display/LCD; simulate rounds as fast as possible")
+    ap.add_argument("--rounds", type=int, default=100, help="rounds to play with --headless")
+    ap.add_argument("--seed", type=int, default=None, help="make the run reproducible")
+    ap.add_argument("--replay", metavar="PATH", default=None,
+                    help="append each round's seed/weights/outcome to a replay log (see replay.py)")
+    ap.add_argument("--profile", action="store_true",
+                    help="log per-phase p50/p95/max and frame-budget overruns (see profiler.py)")
+    ap.add_argument("--resume", action="store_true",
+                    help=f"continue the round saved in {C.CHECKPOINT_FILE} (see checkpoint.py)")
+    ap.add_argument("--checkpoint", metavar="PATH", default=None,
+                    help=f"checkpoint file instead of {C.CHECKPOINT_FILE}; headless runs only "
+                         "checkpoint with this or --resume")
+    args = ap.parse_args()
+    if args.headless:
+        run_headless(args.rounds, seed=args.seed, replay_path=args.replay, profile=args.profile,
+                     resume=args.resume, checkpoint_path=args.checkpoint)
+    else:
+        main(args.seed, args.replay, args.profile, args.resume, args.checkpoint)
@@ -1,6 +1,23 @@
-import json, os, random
+# meta.py
+# Role-weight learning state, kept in two files:
+#
+#   META_LOG  - append-only binary round history: a header, then one fixed-size record
+#               per round (round, ticks, winner, survivors_by_role, weights before and
+#               after). Appends never rewrite old data; a torn last record is ignored.
+#   META_FILE - compacted snapshot (meta.json: role_weights, rounds), rewritten
+#               atomically every META_SNAPSHOT_ROUNDS rounds.
+#
+# load_meta() reads the snapshot and then only the log's last record, so startup costs
+# the same after ten rounds or a million. read_log() memory-maps the whole history as a
+# numpy record array for analysis.
+import json, os, random, struct
 from typing import List
-from config import META_FILE, NUM_TEAMS
+import numpy as np
+from config import META_FILE, META_LOG, META_SNAPSHOT_ROUNDS, NUM_TEAMS
+
+LOG_MAGIC   = b"ANTL"
+LOG_VERSION = 1
+_LOG_HEADER = struct.Struct("<4sBBxx")   # magic, version, num_teams
 
 def _default():
     return {
@@ -8,37 +25,131 @@ def _default():
         "rounds": 0
     }
 
-def load_meta():
-    if not os.path.exists(META_FILE):
-        return _default()
+def log_dtype(num_teams=NUM_TEAMS):
+    """One round record; packed little-endian, so it maps the file byte for byte."""
+    return np.dtype([("round", "<u4"), ("ticks", "<u4"), ("winner", "i1"),   # winner -1 = draw
+                     ("survivors", "<u2", (num_teams, 4)),
+                     ("weights_before", "<f8", (num_teams, 4)),
+                     ("weights_after",  "<f8", (num_teams, 4))])
+
+class RoundLog:
+    """Append-only writer for META_LOG. Each record is flushed and fsynced, so a power cut
+       loses at most the round being written."""
+
+    def __init__(self, path=META_LOG, num_teams=NUM_TEAMS):
+        self.path = path
+        self.num_teams = num_teams
+        self.rec = struct.Struct(f"<IIb{num_teams*4}H{num_teams*8}d")
+        self.f = open(path, "a+b")
+        size = self.f.seek(0, os.SEEK_END)
+        if size == 0:
+            self.f.write(_LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, num_teams))
+            self.f.flush()
+            return
+        self.f.seek(0)
+        head = self.f.read(_LOG_HEADER.size)
+        if len(head) < _LOG_HEADER.size or _LOG_HEADER.unpack(head) != (LOG_MAGIC, LOG_VERSION, num_teams):
+            self.f.close()
+            raise ValueError(f"{path}: not a v{LOG_VERSION} round log for {num_teams} teams")
+        torn = (size - _LOG_HEADER.size) % self.rec.size
+        if torn:
+            self.f.truncate(size - torn)
+
+    def records(self):
+        return (self.f.seek(0, os.SEEK_END) - _LOG_HEADER.size) // self.rec.size
+
+    def append(self, round_id, winner, survivors_by_role, weights_before, weights_after, ticks):
+        flat_s = [min(0xFFFF, int(x)) for row in survivors_by_role for x in row]
+        flat_w = [float(x) for rows in (weights_before, weights_after) for row in rows for x in row]
+        self.f.write(self.rec.pack(round_id, ticks, -1 if winner is None else winner, *flat_s, *flat_w))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.f.close()
+
+def read_log(path=META_LOG):
+    """The whole round history as a read-only numpy record array backed by the file
+       (np.memmap): fields round, ticks, winner, survivors, weights_before, weights_after.
+       Nothing is read until it is used, so this is instant for any log size."""
+    with open(path, "rb") as f:
+        head = f.read(_LOG_HEADER.size)
+    magic, ver, teams = _LOG_HEADER.unpack(head)
+    if magic != LOG_MAGIC or ver != LOG_VERSION:
+        raise ValueError(f"{path}: not a v{LOG_VERSION} round log")
+    dt = log_dtype(teams)
+    n = (os.path.getsize(path) - _LOG_HEADER.size) // dt.itemsize
+    if n == 0:
+        return np.zeros(0, dt)
+    return np.memmap(path, dt, mode="r", offset=_LOG_HEADER.size, shape=(n,))
+
+def _last_logged(path):
+    """(rounds played, role_weights) from the log's last whole record, or None."""
     try:
-        with open(META_FILE, "r") as f:
-            data = json.load(f)
-        # sanity
-        if "role_weights" not in data or len(data["role_weights"]) != NUM_TEAMS:
-            data = _default()
-        return data
-    except Exception:
-        return _default()
-
-def save_meta(data):
+        with open(path, "rb") as f:
+            magic, ver, teams = _LOG_HEADER.unpack(f.read(_LOG_HEADER.size))
+            if magic != LOG_MAGIC or ver != LOG_VERSION or teams != NUM_TEAMS: return None
+            dt = log_dtype(teams)
+            n = (f.seek(0, os.SEEK_END) - _LOG_HEADER.size) // dt.itemsize
+            if n == 0: return None
+            f.seek(_LOG_HEADER.size + (n - 1) * dt.itemsize)
+            last = np.frombuffer(f.read(dt.itemsize), dt)[0]
+    except (OSError, struct.error):
+        return None
+    return int(last["round"]) + 1, last["weights_after"].tolist()
+
+def load_meta(path=META_FILE, log_path=META_LOG):
+    """Snapshot, brought up to date by the log's last record if the log is ahead of it."""
+    data = _default()
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                snap = json.load(f)
+            # sanity
+            if len(snap.get("role_weights", ())) == NUM_TEAMS and "rounds" in snap:
+                data = snap
+        except (OSError, ValueError) as e:
+            print(f"[meta] ignoring unreadable {path}: {e}")
+    last = _last_logged(log_path)
+    if last is not None and last[0] > data["rounds"]:
+        data["rounds"], data["role_weights"] = last
+    return data
+
+def save_meta(data, path=META_FILE):
+    """Write via temp file + rename so a crash or power cut never leaves a torn meta.json.
+       Errors propagate (after removing the temp file); the old snapshot stays intact."""
+    tmp = path + ".tmp"
     try:
-        with open(META_FILE, "w") as f:
+        with open(tmp, "w") as f:
             json.dump(data, f)
-    except Exception:
-        pass
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def record_round(meta, log, winner, survivors_by_role, weights_before, ticks, path=META_FILE):
+    """Persist a round that update_after_round has just applied: append it to `log`
+       (a RoundLog, or None) and write the snapshot every META_SNAPSHOT_ROUNDS rounds
+       (every round when there is no log)."""
+    if log is not None:
+        log.append(meta["rounds"] - 1, winner, survivors_by_role, weights_before,
+                   meta["role_weights"], ticks)
+    if log is None or meta["rounds"] % META_SNAPSHOT_ROUNDS == 0:
+        save_meta(meta, path)
 
 def _normalize(w):
     s = sum(w)
     return [x/s*10.0 for x in w] if s>0 else [2.5,2.5,2.5,2.5]
 
-def update_after_round(meta, winner_team: int, survivors_by_role: List[List[int]]):
+def update_after_round(meta, winner_team: int, survivors_by_role: List[List[int]], rng=random):
     """Very small 'learning': increase weight for roles that survived for the winner;
-       slight random jitter for exploration; normalize to about sum=10."""
+       slight random jitter for exploration (drawn from rng); normalize to about sum=10."""
     if winner_team is None:
         # draw → tiny jitter for both
-        for t in range(NUM_TEAMS):
-            meta["role_weights"][t] = _normalize([max(0.5, w*(1.0 + random.uniform(-0.03,0.03)))
+        for t in range(len(meta["role_weights"])):
+            meta["role_weights"][t] = _normalize([max(0.5, w*(1.0 + rng.uniform(-0.03,0.03)))
                                                   for w in meta["role_weights"][t]])
         meta["rounds"] += 1
         return meta
@@ -51,14 +162,14 @@ def update_after_round(meta, winner_team: int, survivors_by_role: List[List[int]
     boost = [1.0 + 0.10*(c/tot) for c in surv]
     neww = [max(0.3, b*m) for b,m in zip(base, boost)]
     # small randomization
-    neww = [w*(1.0 + random.uniform(-0.02,0.04)) for w in neww]
+    neww = [w*(1.0 + rng.uniform(-0.02,0.04)) for w in neww]
     meta["role_weights"][winner_team] = _normalize(neww)
 
     # loser(s) get gentle shake-up
-    for t in range(NUM_TEAMS):
+    for t in range(len(meta["role_weights"])):
         if t == winner_team: continue
         w = meta["role_weights"][t]
-        w = [max(0.3, x*(1.0 + random.uniform(-0.05,0.05))) for x in w]
+        w = [max(0.3, x*(1.0 + rng.uniform(-0.05,0.05))) for x in w]
         meta["role_weights"][t] = _normalize(w)
 
     meta["rounds"] += 1
@@ -0,0 +1,71 @@
+# pheromone.py
+# Per-team scent grids for FORAGE_MODE = "pheromone".
+#
+#   FOOD_TRAIL - laid by scavengers carrying food home, strongest next to the food;
+#   HOME_TRAIL - laid by scavengers out searching, strongest next to home.
+#
+# Both layers of every team live in one float32 array of shape (2, teams, rows, cols)
+# (one cell = PHER_CELL world px), so evaporation + diffusion is a single vectorized
+# step per tick. Units only ever touch a handful of cells: deposit() writes one,
+# steer() reads three sensors ahead of the ant. No unit scans the food list.
+import math
+import numpy as np
+import config as C
+
+FOOD_TRAIL, HOME_TRAIL = 0, 1
+
+class PheromoneField:
+    def __init__(self, num_teams=C.NUM_TEAMS, w=C.WIDTH, h=C.HEIGHT, cell=C.PHER_CELL):
+        self.cell = cell
+        self.cols = int(math.ceil(w / cell))
+        self.rows = int(math.ceil(h / cell))
+        self.grid = np.zeros((2, num_teams, self.rows, self.cols), np.float32)
+        self._pad = np.zeros((2, num_teams, self.rows + 2, self.cols + 2), np.float32)
+        self.keep = np.float32(1.0 - C.PHER_EVAPORATE)
+        self.diffuse = np.float32(C.PHER_DIFFUSE)
+
+    def _cell(self, x, y):
+        cx = int(x // self.cell); cy = int(y // self.cell)
+        if 0 <= cx < self.cols and 0 <= cy < self.rows: return cy, cx
+        return None
+
+    def deposit(self, layer, team, x, y, amount):
+        c = self._cell(x, y)
+        if c is not None and amount > 0:
+            g = self.grid[layer, team]
+            g[c] = min(C.PHER_MAX, g[c] + amount)
+
+    def at(self, layer, team, x, y):
+        c = self._cell(x, y)
+        return 0.0 if c is None else float(self.grid[layer, team][c])
+
+    def steer(self, layer, team, x, y, angle):
+        """Heading toward the strongest of three sensors ahead (left / front / right), if that
+           sensor smells more than PHER_MIN and more than the ant's own cell (uphill only);
+           otherwise None."""
+        g = self.grid[layer, team]
+        here = self._cell(x, y)
+        best = None
+        bv = max(C.PHER_MIN, float(g[here]) if here is not None else 0.0)
+        d = C.PHER_SENSE_DIST
+        for da in (0.0, -C.PHER_SENSE_ANGLE, C.PHER_SENSE_ANGLE):
+            a = angle + da
+            c = self._cell(x + math.cos(a)*d, y + math.sin(a)*d)
+            if c is None: continue
+            v = float(g[c])
+            if v > bv: best, bv = a, v
+        return best
+
+    def step(self):
+        """Evaporate, then diffuse to the 4 neighbours (edges reflect), for every layer at once."""
+        g, p = self.grid, self._pad
+        g *= self.keep
+        if self.diffuse:
+            p[..., 1:-1, 1:-1] = g
+            p[..., 0, 1:-1] = g[..., 0, :];  p[..., -1, 1:-1] = g[..., -1, :]
+            p[..., 1:-1, 0] = g[..., :, 0];  p[..., 1:-1, -1] = g[..., :, -1]
+            avg = p[..., :-2, 1:-1] + p[..., 2:, 1:-1] + p[..., 1:-1, :-2] + p[..., 1:-1, 2:]
+            avg *= np.float32(0.25)
+            g *= np.float32(1.0) - self.diffuse
+            avg *= self.diffuse
+            g += avg
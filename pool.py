@@ -0,0 +1,158 @@
+# pool.py
+# Food / resource storage: parallel arrays with stable integer handles.
+#
+#  - slots are dense (0..n-1) so drawing and bulk work walk plain arrays;
+#  - removal swaps the last slot into the hole: O(1), no list searching;
+#  - handles = index | generation << 32, so a handle kept after its item was taken
+#    never aliases a newer item that reuses the index (free list);
+#  - a bucket grid (spatial.GridGeometry) answers nearest() with the same
+#    tie-break as the old lists: equal distances go to the oldest item;
+#  - an item can be claimed by one owner (a unit heading for it); nearest(owner=...)
+#    skips items claimed by anyone else, and removal drops the claim.
+from array import array
+import pygame
+from config import WIDTH, HEIGHT
+from spatial import GridGeometry, CELL
+
+_IDX = 0xFFFFFFFF
+
+class ItemPool(GridGeometry):
+    def __init__(self, colors, vis_r, cell=CELL, w=WIDTH, h=HEIGHT):
+        self.colors = colors      # per kind
+        self.vis_r = vis_r
+        self._grid_init(cell, w, h, bucket=set)
+        self.clear()
+
+    def clear(self):
+        # dense, by slot
+        self.x, self.y = array("d"), array("d")
+        self.kind  = array("b")
+        self.seq   = array("q")   # insertion order, for tie-breaks
+        self.owner = array("q")   # slot -> index
+        # sparse, by index
+        self._slot = array("q")   # index -> slot, -1 when free
+        self._gen  = array("q")
+        self._bkt  = array("q")   # index -> grid bucket
+        self._free = []
+        self._next_seq = 0
+        self._claims = {}         # index -> owner
+        for b in self._buckets: b.clear()
+
+    # ---- handles ----
+    def __len__(self): return len(self.x)
+
+    def __contains__(self, h):
+        i = h & _IDX
+        return i < len(self._slot) and self._slot[i] >= 0 and self._gen[i] == h >> 32
+
+    def pos(self, h):
+        s = self._slot[h & _IDX]
+        return self.x[s], self.y[s]
+
+    def kind_of(self, h):
+        return self.kind[self._slot[h & _IDX]]
+
+    def handles(self):
+        return [i | self._gen[i] << 32 for i in self.owner]
+
+    # ---- add / remove ----
+    def add(self, x, y, kind=0):
+        if self._free:
+            i = self._free.pop()
+        else:
+            i = len(self._slot)
+            self._slot.append(-1); self._gen.append(0); self._bkt.append(0)
+        s = len(self.x)
+        self.x.append(x); self.y.append(y); self.kind.append(kind)
+        self.seq.append(self._next_seq); self._next_seq += 1
+        self.owner.append(i)
+        self._slot[i] = s
+        b = self._bucket_xy(x, y)
+        self._buckets[b].add(i)
+        self._bkt[i] = b
+        return i | self._gen[i] << 32
+
+    def add_many(self, xs, ys, kinds=None):
+        if kinds is None: kinds = [0] * len(xs)
+        for x, y, k in zip(xs, ys, kinds):
+            self.add(x, y, k)
+
+    def restore(self, xs, ys, kinds, seqs):
+        """Refill from saved slot arrays (checkpoint.py). Handles are new; slot order and
+           tie-break order are kept. Returns the handles, by slot."""
+        self.clear()
+        self.add_many(xs, ys, kinds)
+        self.seq = array("q", seqs)
+        self._next_seq = max(seqs) + 1 if seqs else 0
+        return self.handles()
+
+    def remove(self, h):
+        i = h & _IDX
+        if h not in self: raise KeyError(h)
+        s = self._slot[i]
+        last = len(self.x) - 1
+        if s != last:
+            j = self.owner[last]
+            self.x[s], self.y[s], self.kind[s] = self.x[last], self.y[last], self.kind[last]
+            self.seq[s], self.owner[s] = self.seq[last], j
+            self._slot[j] = s
+        for a in (self.x, self.y, self.kind, self.seq, self.owner): a.pop()
+        self._buckets[self._bkt[i]].discard(i)
+        self._claims.pop(i, None)
+        self._slot[i] = -1
+        self._gen[i] += 1
+        self._free.append(i)
+
+    # ---- claims ----
+    def claim(self, h, owner):
+        self._claims[h & _IDX] = owner
+
+    def release(self, h, owner):
+        i = h & _IDX
+        if h in self and self._claims.get(i) == owner: del self._claims[i]
+
+    def claimed_by(self, h):
+        return self._claims.get(h & _IDX) if h in self else None
+
+    # ---- queries ----
+    def nearest(self, x, y, pred=None, max_d2=None, owner=None):
+        """Handle of the closest item (oldest on ties), or None; pred gets the handle.
+           With owner, items claimed by someone else don't count."""
+        if not self.x: return None
+        cx, cy = self._cell_xy(x, y)
+        X, Y, SEQ, slot, gen = self.x, self.y, self.seq, self._slot, self._gen
+        claims = self._claims if owner is not None and self._claims else None
+        best = None; bd = bs = 0
+        for ring in range(self._max_ring(cx, cy, max_d2) + 1):
+            full = self._scan_cheaper(ring, len(X))
+            if full:   # every item, same (d2, seq) order
+                best = None
+                cand = ((self.owner[s], s) for s in range(len(X)))
+            else:
+                cand = ((i, slot[i]) for bucket in self._ring(cx, cy, ring) for i in bucket)
+            for i, s in cand:
+                dx = X[s] - x; dy = Y[s] - y
+                d2 = dx*dx + dy*dy
+                if max_d2 is not None and d2 >= max_d2: continue
+                if best is not None and (d2 > bd or (d2 == bd and SEQ[s] > bs)): continue
+                if claims is not None and claims.get(i, owner) != owner: continue
+                if pred is not None and not pred(i | gen[i] << 32): continue
+                best, bd, bs = i, d2, SEQ[s]
+            if full: break
+            if best is not None:
+                edge = self._searched_edge(x, y, cx, cy, ring)
+                if edge > 0 and bd < edge*edge: break
+        return None if best is None else best | gen[best] << 32
+
+    # ---- render ----
+    def draw(self, surf):
+        r = max(1, self.vis_r)
+        cols = self.colors
+        if r <= 1:
+            for x, y, k in zip(self.x, self.y, self.kind):
+                x = int(x); y = int(y)
+                if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+                    surf.set_at((x, y), cols[k])
+        else:
+            for x, y, k in zip(self.x, self.y, self.kind):
+                pygame.draw.circle(surf, cols[k], (int(x), int(y)), r)
@@ -0,0 +1,83 @@
+# profiler.py
+# Low-overhead per-phase frame timing. Each frame: begin(), then mark(phase) after each
+# phase (it records the time since the previous mark), then end(). The last RING frames
+# are kept in fixed-size arrays; report() prints p50/p95/max per phase plus how many frames
+# blew the 1/FPS budget. When profiling is off, callers hold None and skip the calls.
+import time
+from array import array
+import config as C
+
+PHASES = ("events", "spawn", "buildings", "reproduce", "units", "combat", "round_end", "checkpoint",
+          "draw", "present")
+
+class PhaseProfiler:
+    def __init__(self, phases=PHASES, ring=C.PROFILE_RING, budget_ms=1000.0 / C.FPS):
+        self.phases = phases
+        self._ix = {p: i for i, p in enumerate(phases)}
+        self.ring = ring
+        self.budget = budget_ms / 1000.0
+        self._samples = [array("d", [0.0]) * ring for _ in phases]   # seconds
+        self._total = array("d", [0.0]) * ring
+        self._cur = array("d", [0.0]) * len(phases)
+        self.frames = 0          # frames recorded so far
+        self.over = 0            # frames whose work exceeded the budget (lifetime)
+        self._over_since = 0     # ... since the last report
+        self._frames_since = 0
+        self._t0 = self._last = 0.0
+        self._last_report = time.perf_counter()
+
+    def begin(self):
+        self._t0 = self._last = time.perf_counter()
+        cur = self._cur
+        for i in range(len(cur)): cur[i] = 0.0
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self._cur[self._ix[phase]] += now - self._last
+        self._last = now
+
+    def end(self):
+        total = self._last - self._t0
+        slot = self.frames % self.ring
+        for i, s in enumerate(self._samples):
+            s[slot] = self._cur[i]
+        self._total[slot] = total
+        self.frames += 1
+        self._frames_since += 1
+        if total > self.budget:
+            self.over += 1
+            self._over_since += 1
+
+    # ---- reporting ----
+    def _window(self, seq):
+        n = min(self.frames, self.ring)
+        return sorted(seq[:n]) if n else [0.0]
+
+    @staticmethod
+    def _pct(s, q): return s[min(len(s) - 1, int(q * len(s)))] * 1000.0
+
+    def summary(self):
+        """{phase: (p50, p95, max) in ms} over the ring, plus 'total'."""
+        out = {}
+        for p, seq in list(zip(self.phases, self._samples)) + [("total", self._total)]:
+            s = self._window(seq)
+            out[p] = (self._pct(s, 0.50), self._pct(s, 0.95), s[-1] * 1000.0)
+        return out
+
+    def report(self, out=print):
+        summ = self.summary()
+        parts = [f"{p} {a:.2f}/{b:.2f}/{c:.2f}" for p, (a, b, c) in summ.items()]
+        pct = 100.0 * self._over_since / max(1, self._frames_since)
+        out(f"[prof] {self._frames_since} frames, {self._over_since} over {self.budget*1000:.1f}ms "
+            f"({pct:.1f}%), lifetime {self.over}/{self.frames} | p50/p95/max ms: " + "  ".join(parts))
+        self._frames_since = self._over_since = 0
+
+    def maybe_report(self, every_s=C.PROFILE_REPORT_SECS):
+        now = time.perf_counter()
+        if now - self._last_report >= every_s:
+            self._last_report = now
+            self.report()
+
+    def hud_line(self):
+        s = self._window(self._total)
+        return f"{self._pct(s, 0.95):.1f}ms p95 ov:{self.over}"
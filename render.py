@@ -0,0 +1,207 @@
+# render.py
+# Layered frame drawing. Buildings never move, so they are painted once into a cached
+# static layer from pre-rendered (btype, team) sprites and repainted only when the
+# building set changes (BuildingList.version, or a new BuildingList after a restart).
+# Per frame: clear, resources + food, one colorkeyed blit of the static layer (keeps
+# buildings above food, as before), health ticks if enabled, units.
+#
+# Units, food and resources are not drawn one set_at / circle at a time: positions and
+# palette indices are gathered into arrays and scattered into the surface's pixels in one
+# fancy-indexed write (radius > 1 expands each point by the offsets of pygame's filled
+# circle). Later points overwrite earlier ones, as the per-entity draws did.
+#
+# Worlds larger than the panel go through a camera.Camera: "follow" draws the same layers
+# shifted into a panel-sized window (buildings outside it are skipped), "overview" bins
+# every entity into panel pixels and shades each pixel by how many fell into it.
+import numpy as np
+import pygame
+import config as C
+from entities import draw_building_shape, building_fill_color
+
+_KEY = (0, 0, 0)   # transparent colour of sprites / static layer (= background)
+_PAD = 2
+
+def stamp_offsets(r):
+    """(dx, dy) of the pixels pygame.draw.circle(surf, c, p, r) fills; r <= 1 is one pixel."""
+    if r <= 1:
+        return np.zeros(1, np.intp), np.zeros(1, np.intp)
+    c = r + 1
+    s = pygame.Surface((2*c + 1, 2*c + 1), 0, 32)
+    pygame.draw.circle(s, (255, 255, 255), (c, c), r)
+    dx, dy = np.nonzero(pygame.surfarray.array2d(s))
+    return dx - c, dy - c
+
+def scatter(px, xs, ys, cols, stamp, ox=0, oy=0):
+    """Write cols[i] at (int(xs[i]) - ox, int(ys[i]) - oy) + every stamp offset into
+       px[x, y], clipped to the surface."""
+    xs = xs.astype(np.intp) - ox; ys = ys.astype(np.intp) - oy   # truncates like int()
+    dx, dy = stamp
+    if dx.size > 1:
+        xs = (xs[:, None] + dx).ravel()
+        ys = (ys[:, None] + dy).ravel()
+        cols = np.repeat(cols, dx.size)
+    w, h = px.shape
+    ok = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    px[xs[ok], ys[ok]] = cols[ok]
+
+def _unit_coords(units):
+    if hasattr(units, "coords"): return units.coords()      # swarm.UnitStore
+    n = len(units)
+    return (np.fromiter((u.x for u in units), float, n),
+            np.fromiter((u.y for u in units), float, n),
+            np.fromiter((u.team for u in units), np.intp, n))
+
+def _bin(xs, ys, cats, ncat, sx, sy, vw, vh):
+    """Per-category entity counts per panel pixel: (ncat, vw*vh), pixel index x*vh + y."""
+    ix = np.clip((xs * sx).astype(np.intp), 0, vw - 1)
+    iy = np.clip((ys * sy).astype(np.intp), 0, vh - 1)
+    flat = cats.astype(np.intp) * (vw*vh) + ix * vh + iy
+    return np.bincount(flat, minlength=ncat * vw*vh).reshape(ncat, vw*vh)
+
+class Renderer:
+    def __init__(self, camera=None):
+        self.camera = camera   # camera.Camera, or None when the world maps 1:1 onto the panel
+        self._sprites = {}     # (btype, team) -> (surface, half size, r_vis)
+        self._layer = None
+        self._key = None       # (id(buildings), buildings.version, mode) the layer was built for
+        self.rebuilds = 0
+        self._stamps = {}      # radius -> stamp_offsets(radius)
+        self._palettes = {}    # (colours, pixel format) -> mapped pixel values
+
+    def _like(self, surf, size):
+        s = pygame.Surface(size, 0, surf)   # same pixel format as the target
+        s.fill(_KEY)
+        s.set_colorkey(_KEY)
+        return s
+
+    def sprite(self, target, btype, team):
+        spr = self._sprites.get((btype, team))
+        if spr is None:
+            half = max(C.VIS_HOME_R, C.VIS_BUILD_R, 5, C.VIS_WALL_W) + _PAD
+            s = self._like(target, (2*half + 1, 2*half + 1))
+            r_vis = draw_building_shape(s, btype, team, half, half)
+            spr = self._sprites[(btype, team)] = (s, half, r_vis)
+        return spr
+
+    def static_layer(self, target, buildings, overview=None):
+        """Buildings on a transparent panel-sized layer, repainted only when the building
+           set changes. With an overview camera they are reduced to markers at map scale."""
+        key = (id(buildings), buildings.version, overview is not None)
+        if self._layer is None or self._layer.get_size() != target.get_size():
+            self._layer = self._like(target, target.get_size())
+            self._key = None
+        if key != self._key:
+            layer = self._layer
+            layer.fill(_KEY)
+            if overview is None:
+                blits = []
+                for b in buildings:
+                    spr, half, _ = self.sprite(target, b.btype, b.team)
+                    blits.append((spr, (int(b.x) - half, int(b.y) - half)))
+                layer.blits(blits, doreturn=False)
+            else:
+                for b in buildings:
+                    x, y = int(b.x * overview.sx), int(b.y * overview.sy)
+                    if b.is_home():
+                        layer.fill(C.TEAM_COLORS[b.team], (x - 1, y - 1, 3, 3))
+                        layer.set_at((x, y), C.BUILDING_COLORS["home"])
+                    else:
+                        layer.set_at((x, y), building_fill_color(b.btype))
+            self._key = key
+            self.rebuilds += 1
+        return self._layer
+
+    def _stamp(self, r):
+        st = self._stamps.get(r)
+        if st is None: st = self._stamps[r] = stamp_offsets(r)
+        return st
+
+    def _palette(self, screen, px, colors):
+        key = (tuple(colors), screen.get_bitsize(), screen.get_masks())
+        pal = self._palettes.get(key)
+        if pal is None:
+            pal = self._palettes[key] = np.array([screen.map_rgb(c) for c in colors], dtype=px.dtype)
+        return pal
+
+    def _scatter_pools(self, screen, pools, ox=0, oy=0):
+        px = pygame.surfarray.pixels2d(screen)    # locks the surface until released
+        for pool in pools:
+            if not len(pool): continue
+            # zero-copy views of the pool's arrays; they must not outlive this call, or
+            # the pool could no longer grow its array('d') buffers
+            scatter(px, np.frombuffer(pool.x), np.frombuffer(pool.y),
+                    self._palette(screen, px, pool.colors)[np.frombuffer(pool.kind, dtype=np.int8)],
+                    self._stamp(pool.vis_r), ox, oy)
+        del px
+
+    def _scatter_units(self, screen, coords, ox=0, oy=0):
+        xs, ys, team = coords
+        if not len(xs): return
+        px = pygame.surfarray.pixels2d(screen)
+        scatter(px, xs, ys, self._palette(screen, px, C.TEAM_COLORS)[team], self._stamp(C.VIS_UNIT_R), ox, oy)
+        del px
+
+    def draw(self, world, screen):
+        cam = self.camera
+        if cam is not None:
+            coords = _unit_coords(world.units)
+            cam.update(coords[0], coords[1])
+            if cam.mode == "follow": self._draw_follow(world, screen, cam, coords)
+            else:                    self._draw_overview(world, screen, cam, coords)
+            return
+        # pixels2d needs 16- or 32-bit pixels; anything else takes the per-entity path
+        batched = screen.get_bytesize() in (2, 4)
+        screen.fill(_KEY)
+        if batched:
+            self._scatter_pools(screen, (world.resources, world.foods))
+        else:
+            world.resources.draw(screen)
+            world.foods.draw(screen)
+        screen.blit(self.static_layer(screen, world.buildings), (0, 0))
+        if C.DRAW_HEALTH_BARS:
+            for b in world.buildings:
+                b.draw_health(screen, self.sprite(screen, b.btype, b.team)[2])
+        if batched:
+            self._scatter_units(screen, _unit_coords(world.units))
+        else:
+            for u in world.units: u.draw(screen)
+
+    def _draw_follow(self, world, screen, cam, coords):
+        ox, oy = cam.origin
+        vw, vh = screen.get_size()
+        screen.fill(_KEY)
+        self._scatter_pools(screen, (world.resources, world.foods), ox, oy)
+        blits = []
+        for b in world.buildings:
+            spr, half, _ = self.sprite(screen, b.btype, b.team)
+            x, y = int(b.x) - half - ox, int(b.y) - half - oy
+            if -2*half <= x < vw and -2*half <= y < vh:
+                blits.append((spr, (x, y)))
+        screen.blits(blits, doreturn=False)
+        self._scatter_units(screen, coords, ox, oy)
+
+    def _draw_overview(self, world, screen, cam, coords):
+        """Each panel pixel shows the last non-empty of resources, food, units (same order
+           as the 1:1 draw), brighter the more entities were binned into it."""
+        vw, vh = screen.get_size()
+        rgb = np.zeros((vw*vh, 3), np.float32)
+        sat = np.log1p(C.OVERVIEW_SATURATE)
+        def shade(counts, colors):
+            for c, col in zip(counts, colors):
+                hit = c > 0
+                if not hit.any(): continue
+                lvl = 0.35 + 0.65 * np.minimum(1.0, np.log1p(c[hit]) / sat)
+                rgb[hit] = np.asarray(col, np.float32) * lvl[:, None]
+        for pool in (world.resources, world.foods):
+            if not len(pool): continue
+            shade(_bin(np.frombuffer(pool.x), np.frombuffer(pool.y),
+                       np.frombuffer(pool.kind, dtype=np.int8), len(pool.colors),
+                       cam.sx, cam.sy, vw, vh), pool.colors)
+        xs, ys, team = coords
+        if len(xs):
+            shade(_bin(xs, ys, team, C.NUM_TEAMS, cam.sx, cam.sy, vw, vh), C.TEAM_COLORS)
+        mapped = pygame.surfarray.map_array(screen, rgb.astype(np.uint8).reshape(vw, vh, 3))
+        px = pygame.surfarray.pixels2d(screen)
+        px[...] = mapped
+        del px
+        screen.blit(self.static_layer(screen, world.buildings, overview=cam), (0, 0))
@@ -0,0 +1,139 @@
+# replay.py
+# Compact binary log of round inputs (seed + role weights) and outcomes, and a
+# headless re-simulator for it:
+#
+#   python main.py --seed 7 --replay runs.replay     # record while playing
+#   python replay.py runs.replay                      # re-run every round, verify, time it
+#
+# A round is fully determined by its seed, its starting role weights and the gameplay
+# config, so replaying gives identical workloads for before/after benchmarks.
+import argparse, os, struct, time, zlib
+import config as C
+
+MAGIC   = b"ANTR"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBxxI")   # magic, version, num_teams, config fingerprint
+
+# config that shapes a round; everything else (display, camera, profiling, render
+# pacing, file names, colours) may change without invalidating logs or checkpoints
+GAMEPLAY_KEYS = (
+    "NUM_TEAMS", "WIDTH", "HEIGHT", "FPS", "HOME_LAYOUT", "START_UNITS", "MAX_TEAM_POP",
+    "SOA_UNITS", "RESPAWN_TICKS", "RESPAWN_JOINS_WORLD", "ROUND_MAX_TICKS",
+    # movement / foraging
+    "BASE_SPEED", "TURN_SPEED", "SENSE_RANGE", "FORAGE_WAYPOINT_DIST", "FORAGE_TIMEOUT",
+    "FORAGE_MODE", "TARGET_CLAIMS", "RETARGET_TICKS", "OUTWARD_BIAS", "ATTACKER_SPEED_MULT",
+    "PHER_CELL", "PHER_EVAPORATE", "PHER_DIFFUSE", "PHER_DEPOSIT", "PHER_DEPOSIT_DECAY",
+    "PHER_MAX", "PHER_MIN", "PHER_SENSE_DIST", "PHER_SENSE_ANGLE", "PHER_FOOD_SIGHT",
+    "BOUNCE_PAD", "EDGE_BOUNCE_JITTER", "TETHER_FRAC",
+    # energy / food / resources
+    "ENERGY_DECAY", "ROLE_DECAY", "HEALTH_DECAY_WHEN_STARVING", "START_ENERGY", "START_HEALTH",
+    "LOW_ENERGY_HOME", "FOOD_EAT_PER_TICK", "ENERGY_PER_FOOD", "HOME_START_FOOD",
+    "RESOURCE_TYPES", "MAX_FOOD", "MAX_RESOURCES", "FOOD_RESPAWN_CHANCE", "RES_RESPAWN_CHANCE",
+    "REPRODUCE_FOOD_COST",
+    # buildings / combat
+    "HOME_RADIUS", "TOWER_RANGE", "TOWER_COOLDOWN_TICKS", "TOWER_DAMAGE", "MELEE_REACH",
+    "SIEGE_REACH", "DEFENDER_DAMAGE", "ATTACKER_DAMAGE", "SIEGE_DAMAGE", "BATCHED_COMBAT",
+    "BUILD_COSTS", "FARM_YIELD_TICKS", "FARM_YIELD_AMOUNT", "SALVAGE_RATE",
+    "MAX_TOWERS", "MAX_FARMS", "MAX_STORAGE", "MAX_WALLS",
+)
+
+def config_fingerprint():
+    items = [(k, repr(getattr(C, k, None))) for k in sorted(GAMEPLAY_KEYS)]
+    return zlib.crc32(repr(items).encode())
+
+def _record_struct(num_teams):
+    # round_id, seed, ticks, winner (-1 = draw), weights [team][4] f64, survivors [team][4] u16
+    n = num_teams * 4
+    return struct.Struct(f"<IQIb{n}d{n}H")
+
+class ReplayLog:
+    """Append-only writer. Each record is flushed so a crash loses at most the open round."""
+
+    def __init__(self, path, num_teams=C.NUM_TEAMS):
+        self.num_teams = num_teams
+        self.rec = _record_struct(num_teams)
+        header = (MAGIC, VERSION, num_teams, config_fingerprint())
+        self.f = open(path, "a+b")
+        size = self.f.seek(0, os.SEEK_END)
+        if size == 0:
+            self.f.write(_HEADER.pack(*header))
+            return
+        # only ever append rounds recorded under the same header
+        self.f.seek(0)
+        head = self.f.read(_HEADER.size)
+        if len(head) < _HEADER.size or _HEADER.unpack(head) != header:
+            self.f.close()
+            raise ValueError(f"{path}: not a v{VERSION} replay log for {num_teams} teams "
+                             "and the current gameplay config")
+        torn = (size - _HEADER.size) % self.rec.size
+        if torn:
+            self.f.truncate(size - torn)
+
+    def append(self, round_id, seed, ticks, winner, weights, survivors):
+        flat_w = [float(x) for row in weights for x in row]
+        flat_s = [min(0xFFFF, int(x)) for row in survivors for x in row]
+        self.f.write(self.rec.pack(round_id, seed, ticks, -1 if winner is None else winner, *flat_w, *flat_s))
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+def read(path):
+    """Returns (header dict, list of round dicts)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, ver, teams, fp = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or ver != VERSION:
+        raise ValueError(f"{path}: not a v{VERSION} replay log")
+    rec = _record_struct(teams)
+    n = teams * 4
+    rounds = []
+    # a torn last record (power cut mid-write) is ignored
+    for off in range(_HEADER.size, len(data) - rec.size + 1, rec.size):
+        v = rec.unpack_from(data, off)
+        w, s = v[4:4+n], v[4+n:]
+        rounds.append({
+            "round_id": v[0], "seed": v[1], "ticks": v[2], "winner": None if v[3] < 0 else v[3],
+            "weights":   [list(w[t*4:t*4+4]) for t in range(teams)],
+            "survivors": [list(s[t*4:t*4+4]) for t in range(teams)],
+        })
+    return {"num_teams": teams, "fingerprint": fp}, rounds
+
+def resimulate(rnd):
+    """Re-play one logged round headlessly; returns (winner, ticks, survivors)."""
+    from world import new_world
+    world = new_world(meta_state={"role_weights": [list(w) for w in rnd["weights"]], "rounds": 0},
+                      autosave=False, learn=False)
+    world.spawn_initial_world(seed=rnd["seed"])
+    while not world.step():
+        pass
+    return world.last_winner, world.last_round_ticks, world.last_survivors
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-simulate a replay log headlessly")
+    ap.add_argument("path")
+    ap.add_argument("--round", type=int, default=None, help="only this round_id")
+    args = ap.parse_args()
+
+    head, rounds = read(args.path)
+    if head["num_teams"] != C.NUM_TEAMS:
+        raise SystemExit(f"log has {head['num_teams']} teams, config has {C.NUM_TEAMS}")
+    if head["fingerprint"] != config_fingerprint():
+        print("[replay] warning: gameplay config differs from the recording; outcomes may diverge")
+    if args.round is not None:
+        rounds = [r for r in rounds if r["round_id"] == args.round]
+
+    ok = ticks = 0
+    t0 = time.perf_counter()
+    for r in rounds:
+        got = resimulate(r)
+        same = got == (r["winner"], r["ticks"], r["survivors"])
+        ok += same; ticks += got[1]
+        if not same:
+            print(f"[replay] round {r['round_id']} diverged: logged {r['winner']}/{r['ticks']}, got {got[0]}/{got[1]}")
+    el = time.perf_counter() - t0
+    print(f"[replay] {ok}/{len(rounds)} rounds reproduced  {ticks} ticks in {el:.2f}s "
+          f"({ticks/max(el,1e-9):.0f} ticks/s, {ticks/C.FPS/max(el,1e-9):.0f}x real time)")
+
+if __name__ == "__main__":
+    main()
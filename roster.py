@@ -0,0 +1,150 @@
+# roster.py
+# Team / role / building-type bookkeeping kept up to date by the world containers
+# themselves (on spawn, death, build and destroy), so per-tick code reads counts,
+# homes and target lists in O(1) instead of rescanning every unit or building.
+import config as C
+from spatial import IndexedList, IndexedSet
+
+UNIT_ROLES     = ["scavenger","builder","defender","attacker","reproducer"]
+BUILDING_TYPES = ["home","tower","farm","storage","wall"]
+
+class TeamRoster:
+    """Mixin for unit lists (IndexedList or swarm.UnitStore):
+         by_team_role[team][role] -> {id: unit} (insertion ordered)
+         pop[team]                -> units that count for survival (non-reproducers)
+         combat_cells[bucket][team] -> {id: unit}, non-reproducers per grid cell and team
+                                       (empty teams dropped), so enemy searches skip the
+                                       searcher's own team without looking at its units"""
+
+    def __init__(self, *a, **kw):
+        self._roster_reset()
+        super().__init__(*a, **kw)
+
+    def _roster_reset(self):
+        self.by_team_role = [{r: {} for r in UNIT_ROLES} for _ in range(C.NUM_TEAMS)]
+        self.pop = [0]*C.NUM_TEAMS
+        if hasattr(self, "_buckets"):
+            self.combat_cells = [{} for _ in self._buckets]
+
+    def _grid_init(self, *a, **kw):
+        super()._grid_init(*a, **kw)
+        self.combat_cells = [{} for _ in self._buckets]
+
+    def _cell_add(self, bi, u):
+        self.combat_cells[bi].setdefault(u.team, {})[id(u)] = u
+
+    def _cell_del(self, bi, u):
+        cell = self.combat_cells[bi]
+        us = cell[u.team]
+        del us[id(u)]
+        if not us: del cell[u.team]
+
+    def _index(self, u):
+        super()._index(u)
+        self.by_team_role[u.team][u.role][id(u)] = u
+        if u.role != "reproducer":
+            self.pop[u.team] += 1
+            self._cell_add(self._where[id(u)][0], u)
+
+    def _unindex(self, u):
+        if u.role != "reproducer":
+            self.pop[u.team] -= 1
+            self._cell_del(self._where[id(u)][0], u)
+        super()._unindex(u)
+        del self.by_team_role[u.team][u.role][id(u)]
+
+    def moved(self, u):
+        rec = self._where[id(u)]
+        old = rec[0]
+        super().moved(u)
+        if rec[0] != old and u.role != "reproducer":
+            self._cell_del(old, u)
+            self._cell_add(rec[0], u)
+
+    def clear(self):
+        super().clear()
+        self._roster_reset()
+
+    def role_count(self, team, role):
+        return len(self.by_team_role[team][role])
+
+    def nearest_enemy(self, x, y, team, max_d2=None):
+        """Same unit as nearest(x, y, pred=<other team, not a reproducer>, max_d2), but the
+           search only walks the other teams' cells (and stops at once if there are none)."""
+        n = sum(self.pop) - self.pop[team]
+        if n <= 0: return None
+        cells = self.combat_cells
+        where = self._where
+        best = None; bd = bs = 0
+        cx, cy = self._cell_xy(x, y)
+        for ring in range(self._max_ring(cx, cy, max_d2) + 1):
+            full = self._scan_cheaper(ring, n)
+            if full:   # every enemy, same (d2, seq) order
+                best = None
+                cand = (u for t, roles in enumerate(self.by_team_role) if t != team
+                          for r, us in roles.items() if r != "reproducer" for u in us.values())
+            else:
+                cand = (u for bi in self._ring_ids(cx, cy, ring)
+                          for t, us in cells[bi].items() if t != team for u in us.values())
+            for u in cand:
+                dx = u.x - x; dy = u.y - y
+                d2 = dx*dx + dy*dy
+                if max_d2 is not None and d2 >= max_d2: continue
+                if best is not None and d2 > bd: continue
+                seq = where[id(u)][1]
+                if best is not None and d2 == bd and seq > bs: continue
+                best, bd, bs = u, d2, seq
+            if full: break
+            if best is not None:
+                edge = self._searched_edge(x, y, cx, cy, ring)
+                if edge > 0 and bd < edge*edge: break
+        return best
+
+class UnitList(TeamRoster, IndexedList):
+    pass
+
+class BuildingList(IndexedList):
+    """Buildings + per-team home reference, counts by type, and for each team a spatially
+       indexed set of the non-home buildings it may attack (everyone else's). Adding or
+       destroying a building updates all of it in O(teams), without scanning.
+       `version` changes whenever a building is added or removed (render.py's cache key)."""
+
+    def __init__(self, *a, **kw):
+        self.version = 0
+        self._reset_teams()
+        super().__init__(*a, **kw)
+
+    def _reset_teams(self):
+        self.homes   = [None]*C.NUM_TEAMS
+        self._home_sets = [{} for _ in range(C.NUM_TEAMS)]   # id -> home, list order
+        self.counts  = [{bt: 0 for bt in BUILDING_TYPES} for _ in range(C.NUM_TEAMS)]
+        self.targets = [IndexedSet() for _ in range(C.NUM_TEAMS)]
+
+    def _index(self, b):
+        super()._index(b)
+        self.version += 1
+        self.counts[b.team][b.btype] = self.counts[b.team].get(b.btype, 0) + 1
+        if b.is_home():
+            self._home_sets[b.team][id(b)] = b
+            if self.homes[b.team] is None: self.homes[b.team] = b
+        else:
+            for t, lst in enumerate(self.targets):
+                if t != b.team: lst.add(b)
+
+    def _unindex(self, b):
+        super()._unindex(b)
+        self.version += 1
+        self.counts[b.team][b.btype] -= 1
+        if b.is_home():
+            homes = self._home_sets[b.team]
+            del homes[id(b)]
+            if self.homes[b.team] is b:   # the team's first remaining home takes over
+                self.homes[b.team] = next(iter(homes.values()), None)
+        else:
+            for t, lst in enumerate(self.targets):
+                if t != b.team: lst.discard(b)
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+        self._reset_teams()
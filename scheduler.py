@@ -0,0 +1,86 @@
+# scheduler.py
+# Fixed-timestep main-loop pacing: the simulation advances in steps of exactly 1/SIM_HZ
+# of real time however long drawing and the LCD take, and frames are drawn at their own
+# rate (RENDER_FPS).
+#
+#   sched = FixedStep()
+#   while running:
+#       for _ in range(sched.advance()): world.step()
+#       if sched.render_due(): draw + present
+#       sched.sleep()
+#
+# Behind schedule: at most MAX_CATCHUP_STEPS steps run per loop and the rest of the
+# backlog is dropped (game time slows instead of spiralling), and frames are skipped
+# while steps are still owed, up to MAX_FRAMESKIP in a row. Ahead of schedule: no frame
+# is drawn unless the world stepped since the last one, and the loop sleeps until the
+# next step or frame is due.
+import time
+import config as C
+
+class FixedStep:
+    def __init__(self, sim_hz=C.FPS, render_hz=C.RENDER_FPS, max_catchup=C.MAX_CATCHUP_STEPS,
+                 max_frameskip=C.MAX_FRAMESKIP, clock=time.perf_counter, sleep=time.sleep):
+        self.dt = 1.0 / sim_hz
+        self.frame_dt = 1.0 / render_hz
+        self.max_catchup = max_catchup
+        self.max_frameskip = max_frameskip
+        self.clock, self._sleep = clock, sleep
+        self._last = clock()
+        self._acc = 0.0
+        self._next_frame = self._last
+        self._behind = False          # last advance() hit the catch-up cap
+        self._stepped = False         # steps ran since the last rendered frame
+        self._skipped_in_row = 0
+        # lifetime counters
+        self.steps = 0
+        self.frames = 0
+        self.dropped_steps = 0        # backlog thrown away by the catch-up cap
+        self.skipped_frames = 0       # frames not drawn because the sim was behind
+
+    def advance(self):
+        """Number of simulation steps due now (0..max_catchup)."""
+        now = self.clock()
+        self._acc += now - self._last
+        self._last = now
+        n = int(self._acc / self.dt)
+        self._behind = n > self.max_catchup
+        if self._behind:
+            self.dropped_steps += n - self.max_catchup
+            n = self.max_catchup
+            self._acc = 0.0
+        else:
+            self._acc -= n * self.dt
+        if n:
+            self.steps += n
+            self._stepped = True
+        return n
+
+    def render_due(self):
+        """True when a frame should be drawn and presented now."""
+        now = self.clock()
+        if now < self._next_frame or not self._stepped:
+            return False
+        if self._behind and self._skipped_in_row < self.max_frameskip:
+            self._skipped_in_row += 1
+            self.skipped_frames += 1
+            return False
+        self._skipped_in_row = 0
+        self._stepped = False
+        self.frames += 1
+        self._next_frame += self.frame_dt
+        if self._next_frame < now:              # fell behind the frame clock: don't burst
+            self._next_frame = now + self.frame_dt
+        return True
+
+    def sleep(self):
+        """Wait until the next step or frame is due (returns at once when behind)."""
+        now = self.clock()
+        due = self._last + (self.dt - self._acc)          # next simulation step
+        if self._next_frame > now: due = min(due, self._next_frame)
+        wait = due - now
+        if wait > 0.0005:
+            self._sleep(wait)
+
+    def stats(self):
+        return {"steps": self.steps, "frames": self.frames,
+                "dropped_steps": self.dropped_steps, "skipped_frames": self.skipped_frames}
@@ -0,0 +1,240 @@
+# spatial.py
+import heapq
+from bisect import bisect_left
+from config import WIDTH, HEIGHT, TOWER_RANGE
+
+# Cell size: a tower query (r=48) touches at most 7x7 cells, a pickup check (r=4)
+# almost always stays inside one.
+CELL = max(8, TOWER_RANGE // 3)
+
+class GridGeometry:
+    """Bucket layout + ring walking shared by IndexedList / IndexedSet and pool.ItemPool.
+       Users call _grid_init() and fill self._buckets[bucket index]."""
+
+    def _grid_init(self, cell, w, h, bucket=dict):
+        self.cell = cell
+        self.cols = int(w // cell) + 1
+        self.rows = int(h // cell) + 1
+        self._buckets = [bucket() for _ in range(self.cols * self.rows)]
+
+    def _cell_xy(self, x, y):
+        cx = int(x // self.cell); cy = int(y // self.cell)
+        cx = 0 if cx < 0 else self.cols - 1 if cx >= self.cols else cx
+        cy = 0 if cy < 0 else self.rows - 1 if cy >= self.rows else cy
+        return cx, cy
+
+    def _bucket_xy(self, x, y):
+        cx, cy = self._cell_xy(x, y)
+        return cy * self.cols + cx
+
+    def _ring_ids(self, cx, cy, k):
+        """Bucket indices at Chebyshev distance exactly k from (cx, cy), clipped to the grid."""
+        cols, rows = self.cols, self.rows
+        if k == 0:
+            return [cy*cols + cx]
+        x0, x1 = max(0, cx - k), min(cols - 1, cx + k)
+        ids = []
+        for y in (cy - k, cy + k):
+            if 0 <= y < rows:
+                ids.extend(range(y*cols + x0, y*cols + x1 + 1))
+        for y in range(max(0, cy - k + 1), min(rows - 1, cy + k - 1) + 1):
+            row = y * cols
+            for x in (cx - k, cx + k):
+                if 0 <= x < cols:
+                    ids.append(row + x)
+        return ids
+
+    def _ring(self, cx, cy, k):
+        """Buckets at Chebyshev distance exactly k from (cx, cy), clipped to the grid."""
+        B = self._buckets
+        return [B[i] for i in self._ring_ids(cx, cy, k)]
+
+    def _max_ring(self, cx, cy, max_d2):
+        k = max(cx, self.cols - 1 - cx, cy, self.rows - 1 - cy)
+        if max_d2 is not None:
+            k = min(k, int(max_d2 ** 0.5 // self.cell) + 1)
+        return k
+
+    @staticmethod
+    def _scan_cheaper(k, n):
+        """True once walking ring k would visit more buckets than a plain scan visits items
+           (big, sparse maps: no need to sweep thousands of empty cells)."""
+        return (2*k + 1) ** 2 > 2 * n + 8
+
+    def _searched_edge(self, x, y, cx, cy, k):
+        """Distance from (x, y) to the outside of the (2k+1)^2 block already searched."""
+        cs = self.cell
+        return min(x - (cx - k)*cs, (cx + k + 1)*cs - x, y - (cy - k)*cs, (cy + k + 1)*cs - y)
+
+class _GridIndex(GridGeometry):
+    """Grid bookkeeping + queries shared by IndexedList and IndexedSet. Every item has a
+    bucket and a seq; iterating the container yields items in seq order, and seq is the
+    tie-break of every query."""
+
+    def _index_init(self, cell, w, h):
+        self._grid_init(cell, w, h)
+        self._where = {}   # id(item) -> [bucket index, seq]
+        self._seq = 0
+
+    def _bucket_of(self, item):
+        return self._bucket_xy(item.x, item.y)
+
+    def _index(self, item):
+        bi = self._bucket_of(item)
+        self._buckets[bi][id(item)] = item
+        self._where[id(item)] = [bi, self._seq]
+        self._seq += 1
+
+    def _unindex(self, item):
+        bi, _ = self._where.pop(id(item))
+        del self._buckets[bi][id(item)]
+
+    def _index_clear(self):
+        for b in self._buckets: b.clear()
+        self._where.clear()
+        self._seq = 0
+
+    def has(self, item):
+        """O(1) identity membership (`in` would be a linear == scan)."""
+        return id(item) in self._where
+
+    def moved(self, item):
+        rec = self._where[id(item)]
+        bi = self._bucket_of(item)
+        if bi != rec[0]:
+            del self._buckets[rec[0]][id(item)]
+            self._buckets[bi][id(item)] = item
+            rec[0] = bi
+
+    # ---- queries ----
+    def k_nearest(self, x, y, k, pred=None, max_d2=None):
+        """Up to k items closest to (x, y), nearest first; only items with d2 < max_d2 if given."""
+        if k <= 0 or not self: return []
+        cx, cy = self._cell_xy(x, y)
+        where = self._where
+        best = []   # max-heap on (d2, seq) via negation: (-d2, -seq, item)
+        def offer(items):
+            for item in items:
+                dx = item.x - x; dy = item.y - y
+                d2 = dx*dx + dy*dy
+                if max_d2 is not None and d2 >= max_d2: continue
+                seq = where[id(item)][1]
+                if len(best) == k and (d2, seq) >= (-best[0][0], -best[0][1]): continue
+                if pred is not None and not pred(item): continue
+                if len(best) == k: heapq.heapreplace(best, (-d2, -seq, item))
+                else:              heapq.heappush(best, (-d2, -seq, item))
+        for ring in range(self._max_ring(cx, cy, max_d2) + 1):
+            if self._scan_cheaper(ring, len(self)):
+                best.clear(); offer(self)   # same candidates, same (d2, seq) order
+                break
+            for bucket in self._ring(cx, cy, ring):
+                offer(bucket.values())
+            if len(best) == k:
+                edge = self._searched_edge(x, y, cx, cy, ring)
+                if edge > 0 and -best[0][0] < edge*edge: break
+        best.sort(key=lambda t: (-t[0], -t[1]))
+        return [t[2] for t in best]
+
+    def nearest(self, x, y, pred=None, max_d2=None):
+        """Same result as min(filter(pred, self), key=dist2) (None if nothing matches);
+           with max_d2, only items strictly closer than that count."""
+        found = self.k_nearest(x, y, 1, pred, max_d2)
+        return found[0] if found else None
+
+    def within(self, x, y, r2, pred=None):
+        """All items with d2 <= r2 from (x, y), in seq (= list) order."""
+        r = r2 ** 0.5
+        x0, y0 = self._cell_xy(x - r, y - r)
+        x1, y1 = self._cell_xy(x + r, y + r)
+        where = self._where
+        hits = []
+        for cy in range(y0, y1 + 1):
+            row = cy * self.cols
+            for cx in range(x0, x1 + 1):
+                for item in self._buckets[row + cx].values():
+                    dx = item.x - x; dy = item.y - y
+                    if dx*dx + dy*dy <= r2 and (pred is None or pred(item)):
+                        hits.append((where[id(item)][1], item))
+        hits.sort(key=lambda t: t[0])
+        return [t[1] for t in hits]
+
+class IndexedList(_GridIndex, list):
+    """A plain list of world objects (anything with .x/.y) that also keeps them
+    bucketed in a uniform grid.
+
+    Mutate it only through append / extend / remove / discard / replace / clear so the
+    grid stays in sync, and call moved(item) after an item changes position.
+    Subclasses that index more than position extend _index / _unindex / clear.
+    Query results match what a linear scan over the list would return, including
+    tie-breaks: equal distances go to the item that comes first in the list."""
+
+    def __init__(self, items=(), cell=CELL, w=WIDTH, h=HEIGHT):
+        super().__init__()
+        self._index_init(cell, w, h)
+        self.extend(items)
+
+    def append(self, item):
+        super().append(item)
+        self._index(item)
+
+    def extend(self, items):
+        for it in items: self.append(it)
+
+    def remove(self, item):
+        # same element list.remove() would drop (first ==, identity checked first)
+        i = self.index(item)
+        self._unindex(self[i])
+        del self[i]
+
+    def clear(self):
+        super().clear()
+        self._index_clear()
+
+    def discard(self, item):
+        """Remove this exact object (identity, not ==) if present. seq only grows along
+           the list, so the item is found by bisection, not a scan."""
+        rec = self._where.get(id(item))
+        if rec is None: return
+        where = self._where
+        i = bisect_left(self, rec[1], key=lambda it: where[id(it)][1])
+        self._unindex(item)
+        del self[i]
+
+    def replace(self, items):
+        """Make the list hold exactly `items` (in that order), e.g. after filtering out the dead."""
+        keep = {id(it) for it in items}
+        for it in self:
+            if id(it) not in keep:
+                self._unindex(it)
+        self[:] = items
+        where = self._where
+        for seq, it in enumerate(self):
+            if id(it) not in where:
+                self._index(it)
+            where[id(it)][1] = seq
+        self._seq = len(self)
+
+class IndexedSet(_GridIndex):
+    """Insertion-ordered collection keyed by identity, with O(1) add / discard and the
+    same queries as IndexedList (no positions, no indexing). For secondary indexes such
+    as roster.BuildingList's per-team target lists, where removal must not scan."""
+
+    def __init__(self, items=(), cell=CELL, w=WIDTH, h=HEIGHT):
+        self._items = {}   # id(item) -> item, insertion (= seq) order
+        self._index_init(cell, w, h)
+        for it in items: self.add(it)
+
+    def add(self, item):
+        self._items[id(item)] = item
+        self._index(item)
+
+    def discard(self, item):
+        if self._items.pop(id(item), None) is not None:
+            self._unindex(item)
+
+    def clear(self):
+        self._items.clear()
+        self._index_clear()
+
+    def __iter__(self): return iter(self._items.values())
+    def __len__(self):  return len(self._items)
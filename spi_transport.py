@@ -0,0 +1,91 @@
+# spi_transport.py
+# Command/data traffic to the ST7735 over spidev without per-byte Python work:
+#
+#  - data goes out as a memoryview of the caller's buffer (framebuffer, scratch rows),
+#    never as bytes()/list copies. spidev's writebytes2 (takes any buffer, splits at the
+#    kernel's bufsiz itself) sends a whole frame in one call; older spidev falls back
+#    to writebytes on bufsiz-sized slices;
+#  - the DC line is only driven when its level actually changes;
+#  - CASET / RASET are skipped when the window's columns / rows are already set (the
+#    controller keeps them), so a full-frame push is RAMWR + pixels;
+#  - command parameters are written from small preallocated buffers.
+#
+# `spi` / `gpio` are injected, so fakehw's recording fakes drop straight in.
+CASET, RASET, RAMWR = 0x2A, 0x2B, 0x2C
+_BYTE = [bytes([v]) for v in range(256)]   # command bytes, built once
+BUFSIZ_PATH = "/sys/module/spidev/parameters/bufsiz"
+
+def kernel_bufsiz(default=4096):
+    """Largest single spidev transfer the kernel accepts (spidev's `bufsiz` parameter)."""
+    try:
+        with open(BUFSIZ_PATH) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return default
+
+class SpiTransport:
+    def __init__(self, spi, gpio, dc_pin, bufsiz=None):
+        self.spi, self.gpio, self.dc = spi, gpio, dc_pin
+        self.bufsiz = bufsiz or kernel_bufsiz()
+        self._write2 = getattr(spi, "writebytes2", None)
+        self._level = None          # DC level last driven
+        self._span = bytearray(4)
+        self.forget_window()
+
+    def forget_window(self):
+        """Next window() sends CASET and RASET again (after reset/init or raw commands)."""
+        self._cols = self._rows = None
+
+    def _dc_set(self, level):
+        if level != self._level:
+            self.gpio.output(self.dc, level)
+            self._level = level
+
+    def _send(self, buf):
+        if self._write2 is not None:
+            self._write2(buf)
+            return
+        n = self.bufsiz
+        if len(buf) <= n:
+            self.spi.writebytes(buf)
+            return
+        for i in range(0, len(buf), n):
+            self.spi.writebytes(buf[i:i+n])
+
+    def write(self, buf):
+        """Data bytes (DC high) from any C-contiguous buffer: bytes, bytearray, numpy, ..."""
+        mv = memoryview(buf).cast("B")
+        if len(mv):
+            self._dc_set(1)
+            self._send(mv)
+
+    def command(self, cmd, params=None):
+        """One command byte (DC low), then its parameter bytes if any."""
+        self._dc_set(0)
+        self._send(_BYTE[cmd])
+        if params is not None:
+            self.write(params)
+
+    def commands(self, seq):
+        """Run (cmd, params or None) pairs back to back, e.g. an init sequence."""
+        for cmd, params in seq:
+            self.command(cmd, params)
+
+    def _address(self, cmd, a, b):
+        s = self._span   # 16-bit big-endian start / end
+        s[0], s[1], s[2], s[3] = a >> 8, a & 0xFF, b >> 8, b & 0xFF
+        self._dc_set(0)
+        self._send(_BYTE[cmd])
+        self._dc_set(1)
+        self._send(s)
+
+    def window(self, x0, y0, x1, y1):
+        """Select the panel rectangle (inclusive, panel coordinates) and start RAMWR;
+           pixel data follows with write()."""
+        if self._cols != (x0, x1):
+            self._address(CASET, x0, x1)
+            self._cols = (x0, x1)
+        if self._rows != (y0, y1):
+            self._address(RASET, y0, y1)
+            self._rows = (y0, y1)
+        self.command(RAMWR)
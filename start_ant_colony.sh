@@ -26,7 +26,7 @@ sleep 2
 
 # Write our PID and run the app (exec keeps same PID)
 echo $$ > "$PIDFILE"
-exec /usr/bin/python3 main.py >> "$LOGFILE" 2>&1
+exec /usr/bin/python3 main.py --resume >> "$LOGFILE" 2>&1
 EOF
 
 chmod +x /home/dasha/ant_colony/start_ant_colony.sh
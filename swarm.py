@@ -0,0 +1,201 @@
+# swarm.py
+# Struct-of-arrays unit storage: position, angle, speed, energy, health, team and role
+# live in contiguous numpy arrays. Energy decay, starvation, turning, stepping and edge
+# bouncing run as batched array ops over every unit at once; only the role decision
+# (Unit.think) still runs per unit, through a thin UnitView over the arrays.
+#
+# Ordering differs slightly from World: every unit decides on this tick's
+# start-of-move positions, then all units move together. The
+# "am I there yet" checks inside think() therefore see the position from before
+# this tick's step.
+import math
+import numpy as np
+import config as C
+from entities import Unit
+from spatial import IndexedList
+from roster import TeamRoster
+from world import World
+
+ROLE_NAMES = ["scavenger","builder","defender","attacker","reproducer"]
+ROLE_CODES = {r: i for i, r in enumerate(ROLE_NAMES)}
+REPRO = ROLE_CODES["reproducer"]
+
+# per-role energy decay, indexed by role code
+_DECAY = np.array([0.0 if r == "reproducer" else
+                   C.ENERGY_DECAY * C.ROLE_DECAY.get(r, C.ROLE_DECAY["default"]) for r in ROLE_NAMES])
+
+# movement intent recorded by think(), applied in move_all()
+STILL, SEEK, WANDER = 0, 1, 2
+
+def _arr_prop(name, cast):
+    def get(self): return cast(getattr(self._s, name)[self.i])
+    def put(self, v): getattr(self._s, name)[self.i] = v
+    return property(get, put)
+
+class UnitView(Unit):
+    """A Unit whose numeric state lives in a UnitStore row; role logic is inherited as-is.
+       Non-numeric state (home, carry_*, waypoint) stays on the object."""
+    __slots__ = ("_s", "i")
+
+    x      = _arr_prop("x", float)
+    y      = _arr_prop("y", float)
+    angle  = _arr_prop("angle", float)
+    speed  = _arr_prop("speed", float)
+    energy = _arr_prop("energy", float)
+    health = _arr_prop("health", float)
+    team   = _arr_prop("team", int)
+
+    @property
+    def role(self): return ROLE_NAMES[self._s.role[self.i]]
+    @role.setter
+    def role(self, r): self._s.role[self.i] = ROLE_CODES[r]
+
+    # movement is deferred to UnitStore.move_all()
+    def move_towards_point(self, tx, ty):
+        s, i = self._s, self.i
+        s.mode[i] = SEEK; s.tx[i] = tx; s.ty[i] = ty
+
+    def wander(self):
+        self._s.mode[self.i] = WANDER
+
+class UnitStore(TeamRoster, IndexedList):
+    """IndexedList of UnitViews whose rows are kept in list order (row i == self[i]).
+       Appending a plain Unit adopts it: its state is copied into a new row."""
+    _FLOATS = ("x","y","angle","speed","energy","health","hx","hy","tx","ty")
+
+    def __init__(self, capacity=256, rng=None, **kw):
+        self.n = 0
+        self.rng = np.random.default_rng() if rng is None else rng   # movement jitter
+        self._alloc(capacity)
+        super().__init__(**kw)
+
+    def _alloc(self, cap):
+        old = getattr(self, "cap", 0)
+        self.cap = cap
+        for name in self._FLOATS:
+            self._grow(name, np.float64, cap, old)
+        self._grow("team", np.int16, cap, old)
+        self._grow("role", np.int8,  cap, old)
+        self._grow("mode", np.int8,  cap, old)
+        self._grow("bucket", np.int32, cap, old)
+
+    def _grow(self, name, dtype, cap, old):
+        a = np.zeros(cap, dtype=dtype)
+        if old: a[:old] = getattr(self, name)
+        setattr(self, name, a)
+
+    def append(self, u):
+        if not isinstance(u, UnitView):
+            u = self._adopt(u)
+        super().append(u)
+        self.bucket[u.i] = self._where[id(u)][0]
+
+    def _adopt(self, u):
+        if self.n == self.cap: self._alloc(self.cap * 2)
+        i = self.n; self.n += 1
+        self.x[i], self.y[i], self.angle[i], self.speed[i] = u.x, u.y, u.angle, u.speed
+        self.energy[i], self.health[i] = u.energy, u.health
+        self.team[i], self.role[i] = u.team, ROLE_CODES[u.role]
+        self.hx[i], self.hy[i] = u.home.x, u.home.y
+        self.mode[i] = STILL
+        v = UnitView.__new__(UnitView)
+        v._s, v.i = self, i
+        v.home, v.carry_food, v.carry_res = u.home, u.carry_food, u.carry_res
+        v.wp, v.wp_t, v.ph = u.wp, u.wp_t, u.ph
+        v.tgt, v.tgt_t = u.tgt, u.tgt_t
+        return v
+
+    def remove(self, item):
+        self.replace([u for u in self if u is not item])
+
+    def clear(self):
+        super().clear()
+        self.n = 0
+
+    def replace(self, items):
+        same = len(items) == len(self) and all(a is b for a, b in zip(items, self))
+        super().replace(items)   # unindexes the dropped views while their rows are intact
+        if not same:
+            idx = np.fromiter((v.i for v in items), dtype=np.intp, count=len(items))
+            m = len(idx)
+            for name in self._FLOATS + ("team","role","mode","bucket"):
+                a = getattr(self, name)
+                a[:m] = a[idx]
+            for k, v in enumerate(items): v.i = k
+            self.n = m
+
+    def coords(self):
+        """(x, y, team) arrays in list order, for render.py's batched pixel writes."""
+        n = self.n
+        return self.x[:n], self.y[:n], self.team[:n]
+
+    # ---- batched per-tick work ----
+    def tick_needs(self):
+        """Energy decay + starvation damage for every unit."""
+        n = self.n
+        role, energy, health = self.role[:n], self.energy[:n], self.health[:n]
+        energy -= _DECAY[role]
+        health[(role != REPRO) & (energy <= 0)] -= C.HEALTH_DECAY_WHEN_STARVING
+
+    def move_all(self):
+        """Apply every recorded SEEK/WANDER intent: turn, step, bounce, then rebucket movers."""
+        n = self.n
+        mode = self.mode[:n]
+        x, y, ang, spd = self.x[:n], self.y[:n], self.angle[:n], self.speed[:n]
+
+        seek = np.flatnonzero(mode == SEEK)
+        if seek.size:
+            a = np.arctan2(self.ty[seek] - y[seek], self.tx[seek] - x[seek])
+            cur = ang[seek]
+            diff = (a - cur + math.pi) % (2*math.pi) - math.pi
+            ang[seek] = np.where(np.abs(diff) > C.TURN_SPEED, cur + C.TURN_SPEED*np.sign(diff), a)
+
+        wand = np.flatnonzero(mode == WANDER)
+        if wand.size:
+            out_ang = np.arctan2(y[wand] - self.hy[wand], x[wand] - self.hx[wand])
+            a = ang[wand] + self.rng.uniform(-0.08, 0.08, wand.size)
+            ang[wand] = a * (1.0 - C.OUTWARD_BIAS) + out_ang * C.OUTWARD_BIAS
+
+        mv = np.flatnonzero(mode != STILL)
+        if not mv.size: return
+        step = np.where(mode[mv] == WANDER, 0.9, 1.0) * spd[mv]
+        a = ang[mv]
+        nx = x[mv] + np.cos(a)*step
+        ny = y[mv] + np.sin(a)*step
+
+        # edge bounce (same rules as Unit._bounce_if_needed)
+        pad = C.BOUNCE_PAD
+        bx = (nx <= pad) | (nx >= C.WIDTH - pad)
+        by = (ny <= pad) | (ny >= C.HEIGHT - pad)
+        np.clip(nx, pad, C.WIDTH - pad, out=nx)
+        np.clip(ny, pad, C.HEIGHT - pad, out=ny)
+        a = np.where(bx, math.pi - a, a)
+        a = np.where(by, -a, a)
+        hit = bx | by
+        if hit.any():
+            a[hit] += self.rng.uniform(-C.EDGE_BOUNCE_JITTER, C.EDGE_BOUNCE_JITTER, int(hit.sum()))
+        x[mv], y[mv], ang[mv] = nx, ny, a
+        mode[:] = STILL
+
+        # only units that crossed a cell boundary touch the grid
+        cx = np.clip((nx // self.cell).astype(np.int32), 0, self.cols - 1)
+        cy = np.clip((ny // self.cell).astype(np.int32), 0, self.rows - 1)
+        newb = cy * self.cols + cx
+        for k in np.flatnonzero(newb != self.bucket[mv]):
+            i = mv[k]
+            self.moved(self[i])
+            self.bucket[i] = newb[k]
+
+class SwarmWorld(World):
+    """World with numpy-backed units; everything else (buildings, food, rounds) is shared."""
+
+    def new_unit_list(self):
+        return UnitStore(rng=np.random.default_rng(self.round_seed))
+
+    def update_units(self):
+        units = self.units
+        units.tick_needs()
+        alive = [u for u in units
+                 if u.think(self.foods, self.resources, self.buildings, units)]
+        units.move_all()
+        units.replace(alive)
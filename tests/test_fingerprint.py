@@ -0,0 +1,49 @@
+# Display / profiling settings must not invalidate checkpoints or replay logs; gameplay
+# settings must.
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import config as C
+import checkpoint, replay
+from world import new_world
+
+DISPLAY_ONLY = {"PROFILE": True, "PROFILE_HUD": True, "RENDER_FPS": 12, "MAX_CATCHUP_STEPS": 2,
+                "MAX_FRAMESKIP": 1, "CAMERA_MODE": "follow", "OVERVIEW_SATURATE": 2,
+                "TEAM_COLORS": [(1, 2, 3), (4, 5, 6)], "SCALE": 5, "SIM": True}
+
+def _world():
+    w = new_world(meta_state={"role_weights": [[5, 2, 2, 1] for _ in range(C.NUM_TEAMS)]},
+                  autosave=False, learn=False, seed=4)
+    w.spawn_initial_world()
+    for _ in range(60): w.step()
+    return w
+
+def _fresh():
+    return new_world(meta_state={"role_weights": [[1, 1, 1, 1] for _ in range(C.NUM_TEAMS)]},
+                     autosave=False, learn=False)
+
+def test_display_settings_keep_checkpoint(monkeypatch):
+    w = _world()
+    data = checkpoint.dumps(w)
+    for k, v in DISPLAY_ONLY.items():
+        monkeypatch.setattr(C, k, v)
+    w2 = _fresh()
+    checkpoint.loads(w2, data)
+    assert (w2.round_id, w2.tick, len(w2.units)) == (w.round_id, w.tick, len(w.units))
+
+def test_gameplay_setting_rejects_checkpoint(monkeypatch):
+    data = checkpoint.dumps(_world())
+    monkeypatch.setattr(C, "TOWER_DAMAGE", C.TOWER_DAMAGE * 2)
+    with pytest.raises(ValueError, match="different gameplay config"):
+        checkpoint.loads(_fresh(), data)
+
+def test_display_settings_keep_replay_log(monkeypatch, tmp_path):
+    path = tmp_path / "runs.replay"
+    replay.ReplayLog(path).close()
+    for k, v in DISPLAY_ONLY.items():
+        monkeypatch.setattr(C, k, v)
+    replay.ReplayLog(path).close()   # appends without complaint
+    monkeypatch.setattr(C, "MAX_FOOD", C.MAX_FOOD + 1)
+    with pytest.raises(ValueError):
+        replay.ReplayLog(path)
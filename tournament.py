@@ -0,0 +1,125 @@
+# tournament.py
+# Headless brackets between colonies that differ only in their role weights.
+#
+#   python tournament.py --entrants 8 --mode roundrobin --games 2 --workers 4 --seed 1
+#   python tournament.py --weights entrants.json --mode ffa --games 20 --size 512
+#
+# roundrobin: every pair of entrants plays --games two-team rounds, swapping sides each
+#             game; win 3 points, draw 1.
+# ffa:        all entrants share one NUM_TEAMS = N world for --games rounds (starting
+#             spots rotate each game); the winner scores 1 point. Survivors at the end
+#             of each round are tallied as a tie-breaker.
+# Entrants come from --weights (JSON list of [scav, builder, defender, attacker]) or
+# are drawn from --seed. Rounds run in a process pool like trainer.py, and every
+# result depends only on the seed, whatever the worker count. Learning is off.
+import argparse, itertools, json, os, random, time
+from multiprocessing import Pool
+import config as C
+
+_world = None   # one per worker process
+
+def _init_worker(num_teams, size):
+    """Config must be final before world/entities/spatial are imported (values are bound
+       at import time), so workers set it first; the parent never imports them."""
+    global _world
+    C.NUM_TEAMS = num_teams
+    C.TEAM_COLORS = C.team_colors(num_teams)
+    if size:
+        C.WIDTH = C.HEIGHT = size
+        C.FORAGE_WAYPOINT_DIST = int(size * 0.35)
+    weights = [[5,2,2,1] for _ in range(num_teams)]
+    from world import new_world
+    _world = new_world(meta_state={"role_weights": weights, "rounds": 0}, autosave=False, learn=False)
+
+def _play(job):
+    """Worker: one round; `job` = (seed, weights per team). Returns (winner, survivors per team, ticks)."""
+    seed, weights = job
+    _world.meta_state["role_weights"] = weights
+    C.ROLE_WEIGHTS = weights
+    _world.spawn_initial_world(seed=seed)
+    while not _world.step():
+        pass
+    return _world.last_winner, [sum(r) for r in _world.last_survivors], _world.last_round_ticks
+
+def random_entrants(n, seed):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        w = [rng.uniform(0.5, 6.0) for _ in range(4)]
+        s = sum(w)
+        out.append([x / s * 10.0 for x in w])
+    return out
+
+def _schedule(entrants, mode, games, seed):
+    """[(seed, weights per team, entrant id per team)] in a fixed order."""
+    jobs = []
+    if mode == "roundrobin":
+        for a, b in itertools.combinations(range(len(entrants)), 2):
+            for g in range(games):
+                side = (a, b) if g % 2 == 0 else (b, a)
+                jobs.append((side, [entrants[i] for i in side]))
+    else:
+        n = len(entrants)
+        for g in range(games):
+            side = tuple((t + g) % n for t in range(n))
+            jobs.append((side, [entrants[i] for i in side]))
+    return [(seed * 1_000_003 + k, w, side) for k, (side, w) in enumerate(jobs)]
+
+def run(entrants, mode="roundrobin", games=2, workers=None, seed=0, size=None):
+    teams = 2 if mode == "roundrobin" else len(entrants)
+    jobs = _schedule(entrants, mode, games, seed)
+    workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    with Pool(workers, initializer=_init_worker, initargs=(teams, size)) as pool:
+        results = pool.map(_play, [(s, w) for s, w, _ in jobs], chunksize=1)
+
+    table = [{"entrant": i, "weights": w, "played": 0, "won": 0, "drawn": 0, "lost": 0,
+              "points": 0, "survivors": 0} for i, w in enumerate(entrants)]
+    ticks = 0
+    for (_, _, side), (winner, surv, t) in zip(jobs, results):
+        ticks += t
+        for team, e in enumerate(side):
+            row = table[e]
+            row["played"] += 1
+            row["survivors"] += surv[team]
+            if winner is None:
+                row["drawn"] += 1
+                if mode == "roundrobin": row["points"] += 1
+            elif winner == team:
+                row["won"] += 1
+                row["points"] += 3 if mode == "roundrobin" else 1
+            else:
+                row["lost"] += 1
+    standings = sorted(table, key=lambda r: (-r["points"], -r["survivors"], r["entrant"]))
+    el = time.perf_counter() - t0
+    return {"mode": mode, "games": games, "seed": seed, "teams_per_round": teams,
+            "rounds": len(jobs), "ticks": ticks, "seconds": el, "standings": standings}
+
+def _print(res):
+    print(f"[tournament] {res['mode']}: {res['rounds']} rounds, {res['ticks']} ticks in "
+          f"{res['seconds']:.1f}s ({res['ticks']/max(res['seconds'], 1e-9):.0f} ticks/s)")
+    print(" #  entrant  pts   W   D   L  surv  weights")
+    for k, r in enumerate(res["standings"], 1):
+        w = " ".join(f"{x:.2f}" for x in r["weights"])
+        print(f"{k:2d}  {r['entrant']:7d} {r['points']:4d} {r['won']:3d} {r['drawn']:3d} {r['lost']:3d} "
+              f"{r['survivors']:5d}  [{w}]")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Headless round-robin / free-for-all colony tournament")
+    ap.add_argument("--mode", choices=("roundrobin", "ffa"), default="roundrobin")
+    ap.add_argument("--entrants", type=int, default=8, help="random entrants (ignored with --weights)")
+    ap.add_argument("--weights", default=None, help="JSON file: list of [scav, builder, defender, attacker]")
+    ap.add_argument("--games",   type=int, default=2, help="rounds per pairing (roundrobin) or in total (ffa)")
+    ap.add_argument("--workers", type=int, default=None, help="default: all cores")
+    ap.add_argument("--seed",    type=int, default=0)
+    ap.add_argument("--size",    type=int, default=None, help="square world size (default: config)")
+    ap.add_argument("--out",     default=None, help="also write the results as JSON")
+    args = ap.parse_args()
+    if args.weights:
+        with open(args.weights) as f: entrants = json.load(f)
+    else:
+        entrants = random_entrants(args.entrants, args.seed)
+    res = run(entrants, args.mode, args.games, args.workers, args.seed, args.size)
+    _print(res)
+    if args.out:
+        with open(args.out, "w") as f: json.dump(res, f, indent=1)
@@ -0,0 +1,71 @@
+# trainer.py
+# Parallel meta-learning: play many independent headless rounds in a process pool
+# (one World per worker, seeded per round) and fold the outcomes into role_weights.
+#
+#   python trainer.py --rounds 2000 --batch 32 --workers 4 --seed 1
+#
+# Rounds are grouped into batches. Every round in a batch plays with the weights from
+# the start of the batch; the results are then applied through meta.update_after_round
+# in round order. Same seed + batch size => same weights, whatever the worker count.
+# Every round is appended to the META_LOG round history (meta.py).
+import argparse, os, random, time
+from multiprocessing import Pool
+import config as C
+import meta
+
+_world = None   # one per worker process
+
+def _init_worker():
+    global _world
+    from world import new_world
+    _world = new_world(meta_state=meta._default(), autosave=False, learn=False)
+
+def _play_round(job):
+    """Worker: play one full round with the given weights. Returns (winner, survivors_by_role, ticks)."""
+    seed, weights = job
+    _world.meta_state["role_weights"] = weights
+    C.ROLE_WEIGHTS = weights
+    _world.spawn_initial_world(seed=seed)
+    while not _world.step():
+        pass
+    return _world.last_winner, _world.last_survivors, _world.last_round_ticks
+
+def train(rounds, batch=32, workers=None, seed=0, meta_state=None, path=C.META_FILE,
+          log_path=C.META_LOG):
+    meta_state = meta.load_meta(path, log_path) if meta_state is None else meta_state
+    log = meta.RoundLog(log_path) if log_path else None
+    workers = workers or os.cpu_count() or 1
+    learn_rng = random.Random(seed)   # jitter inside update_after_round, independent of workers
+    t0 = time.perf_counter()
+    done = ticks = 0
+    with Pool(workers, initializer=_init_worker) as pool:
+        while done < rounds:
+            n = min(batch, rounds - done)
+            weights = [list(w) for w in meta_state["role_weights"]]
+            jobs = [(seed * 1_000_003 + done + k, weights) for k in range(n)]
+            results = pool.map(_play_round, jobs)   # keeps job order
+
+            for winner, surv, t in results:
+                before = [list(w) for w in meta_state["role_weights"]]
+                meta_state = meta.update_after_round(meta_state, winner, surv, rng=learn_rng)
+                if log is not None:
+                    log.append(meta_state["rounds"] - 1, winner, surv, before,
+                               meta_state["role_weights"], t)
+                ticks += t
+
+            done += n
+            meta.save_meta(meta_state, path)
+            el = time.perf_counter() - t0
+            print(f"[trainer] rounds {done}/{rounds}  {ticks/el:.0f} ticks/s on {workers} workers  "
+                  f"weights {meta_state['role_weights']}")
+    if log is not None: log.close()
+    return meta_state
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Parallel role-weight trainer")
+    ap.add_argument("--rounds",  type=int, default=1000)
+    ap.add_argument("--batch",   type=int, default=32, help="rounds played per weight update")
+    ap.add_argument("--workers", type=int, default=None, help="default: all cores")
+    ap.add_argument("--seed",    type=int, default=0)
+    args = ap.parse_args()
+    train(args.rounds, args.batch, args.workers, args.seed)
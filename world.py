@@ -0,0 +1,247 @@
+# world.py
+# Simulation state + one-tick step. No pygame display, fonts, clock or LCD in here,
+# so the same World runs under main.py's render loop or fully headless.
+import math, random
+from typing import List
+import config as C
+from entities import Unit, Building
+from pool import ItemPool
+from pheromone import PheromoneField
+from combat import Combat
+from roster import UnitList, BuildingList
+import meta
+
+ROLES = ["scavenger","builder","defender","attacker"]
+
+def home_positions(n, w, h, margin, layout="ring"):
+    """Integer home centres for n teams. Two teams land left/right at mid height either way."""
+    if layout == "grid":
+        cols = math.ceil(math.sqrt(n)); rows = math.ceil(n / cols)
+        span = lambda k, m, size: size // 2 if m == 1 else margin + (size - 2*margin) * k // (m - 1)
+        return [(span(t % cols, cols, w), span(t // cols, rows, h)) for t in range(n)]
+    if layout != "ring": raise ValueError(f"unknown HOME_LAYOUT {layout!r}")
+    rx, ry = w / 2 - margin, h // 2 - margin
+    out = []
+    for t in range(n):
+        a = math.pi + 2*math.pi * t / n   # team 0 on the left, then counter-clockwise
+        out.append((int(round(w / 2 + math.cos(a)*rx)), int(round(h // 2 - math.sin(a)*ry))))
+    return out
+
+def timeout_winner(survivors):
+    """Team with the most survivors when time runs out, or None on a tie for first."""
+    top = max(survivors)
+    leaders = [t for t, c in enumerate(survivors) if c == top]
+    return leaders[0] if len(leaders) == 1 else None
+
+class World:
+    def __init__(self, meta_state=None, autosave=True, learn=True, seed=None, replay=None):
+        # --- randomness: every round gets its own seed, drawn from `seed` (None = OS entropy),
+        # and all gameplay randomness of the round comes from self.rng ---
+        self.seeder = random.Random(seed)
+        self.round_seed = None
+        self.round_weights = None   # role weights the current round started with
+        self.rng = random.Random()
+        self.replay = replay        # replay.ReplayLog or None
+        self.prof = None            # profiler.PhaseProfiler when profiling
+
+        # --- world state (IndexedList = list + spatial grid, see spatial.py;
+        #     Unit/BuildingList also keep team/role/type counts, see roster.py;
+        #     food/resources are handle-based pools, see pool.py) ---
+        self.buildings: List[Building] = BuildingList()
+        self.units:     List[Unit]     = self.new_unit_list()
+        self.foods, self.resources = self.new_item_pools()
+        self.pheromones = None      # pheromone.PheromoneField with FORAGE_MODE = "pheromone"
+        self.combat = None          # combat.Combat with BATCHED_COMBAT
+        self.tick     = 0
+        self.round_id = 0
+        self.last_winner = None
+        self.last_round_ticks = 0
+        self.last_survivors = None
+
+        # --- learning state ---
+        self.meta_state = meta.load_meta() if meta_state is None else meta_state
+        self.autosave = autosave   # log every round to META_LOG, snapshot META_FILE (meta.py)
+        self.learn    = learn      # False: rounds don't touch role weights (trainer workers)
+        self.round_log = None      # meta.RoundLog, opened at the first round end; False = off
+        C.ROLE_WEIGHTS = self.meta_state["role_weights"]  # keep per-team weights in sync
+
+    # ----------------- world setup -----------------
+    def new_unit_list(self):
+        return UnitList()
+
+    def new_item_pools(self):
+        return (ItemPool([C.FOOD_COLOR], C.VIS_FOOD_R),
+                ItemPool([C.RES_COLORS[k] for k in C.RESOURCE_TYPES], C.VIS_RES_R))
+
+    def spawn_initial_world(self, seed=None):
+        self.round_seed = self.seeder.getrandbits(63) if seed is None else seed
+        self.rng = rng = random.Random(self.round_seed)
+        self.round_weights = [list(w) for w in C.ROLE_WEIGHTS]
+        self.buildings, self.units = BuildingList(), self.new_unit_list()
+        self.foods, self.resources = self.new_item_pools()
+        self.pheromones = (PheromoneField(C.NUM_TEAMS, C.WIDTH, C.HEIGHT)
+                           if C.FORAGE_MODE == "pheromone" else None)
+        self.combat = Combat() if C.BATCHED_COMBAT else None
+        self.tick = 0
+
+        homes=[]
+        margin = 16 if min(C.WIDTH, C.HEIGHT) <= 128 else 24
+        for t, (hx, hy) in enumerate(home_positions(C.NUM_TEAMS, C.WIDTH, C.HEIGHT, margin, C.HOME_LAYOUT)):
+            b = Building(hx, hy, t, "home", rng=rng, pher=self.pheromones, combat=self.combat)
+            self.buildings.append(b)
+            homes.append(b)
+
+        # starting population
+        for t, home in enumerate(homes):
+            for role, n in C.START_UNITS.items():
+                for _ in range(n):
+                    self.units.append(Unit(home.x, home.y, t, role, home))
+
+        # scatter initial food/resources (same draw order as one-at-a-time spawning)
+        xs, ys = [], []
+        for _ in range(C.MAX_FOOD):
+            xs.append(rng.randint(6, C.WIDTH-6)); ys.append(rng.randint(6, C.HEIGHT-6))
+        self.foods.add_many(xs, ys)
+        xs, ys, kinds = [], [], []
+        for _ in range(C.MAX_RESOURCES):
+            kinds.append(C.RESOURCE_TYPES.index(rng.choice(C.RESOURCE_TYPES)))
+            xs.append(rng.randint(6, C.WIDTH-6)); ys.append(rng.randint(6, C.HEIGHT-6))
+        self.resources.add_many(xs, ys, kinds)
+
+    def spawn_food_and_resources(self):
+        # light, probabilistic respawn each frame
+        rng = self.rng
+        if len(self.foods) < C.MAX_FOOD and rng.random() < C.FOOD_RESPAWN_CHANCE / C.FPS:
+            self.foods.add(rng.randint(6, C.WIDTH-6), rng.randint(6, C.HEIGHT-6))
+        if len(self.resources) < C.MAX_RESOURCES and rng.random() < C.RES_RESPAWN_CHANCE / C.FPS:
+            kind = C.RESOURCE_TYPES.index(rng.choice(C.RESOURCE_TYPES))
+            self.resources.add(rng.randint(6, C.WIDTH-6), rng.randint(6, C.HEIGHT-6), kind)
+
+    def survivors_nonrepro_count(self):
+        return list(self.units.pop)
+
+    def survivors_by_role(self):
+        # [team][scav,builder,defender,attacker]
+        return [[self.units.role_count(t, r) for r in ROLES] for t in range(C.NUM_TEAMS)]
+
+    def home_of(self, team):
+        return self.buildings.homes[team]
+
+    def ensure_reproducer_exists(self):
+        """Guarantee each team always has a reproducer (spawns free at home if missing)."""
+        for t in range(C.NUM_TEAMS):
+            home = self.home_of(t)
+            if not home: continue
+            has_repro = self.units.role_count(t, "reproducer") > 0
+            in_queue  = any(role=="reproducer" for _,role in home.respawn_q)
+            if not has_repro and not in_queue:
+                home.respawn_q.append((1,"reproducer"))
+
+    def end_round_and_restart(self, winner):
+        """Persist tiny 'learning' for role weights and restart the world."""
+        surv_roles = self.survivors_by_role()
+        self.last_survivors = surv_roles
+        if self.replay is not None:
+            self.replay.append(self.round_id, self.round_seed, self.tick, winner,
+                               self.round_weights, surv_roles)
+        if self.learn:
+            before = [list(w) for w in self.meta_state["role_weights"]]
+            self.meta_state = meta.update_after_round(self.meta_state, winner, surv_roles, rng=self.rng)
+            if self.autosave:
+                self.persist_round(winner, surv_roles, before)
+            C.ROLE_WEIGHTS = self.meta_state["role_weights"]
+        self.round_id += 1
+        self.spawn_initial_world()
+
+    def persist_round(self, winner, surv_roles, before):
+        """Log the round and maybe snapshot meta; disk trouble is reported, not fatal."""
+        if self.round_log is None:
+            try:
+                self.round_log = meta.RoundLog()
+            except (OSError, ValueError) as e:
+                print("[meta] round log disabled:", e)
+                self.round_log = False
+        try:
+            meta.record_round(self.meta_state, self.round_log or None, winner, surv_roles,
+                              before, self.tick)
+        except OSError as e:
+            print("[meta] could not save learning state:", e)
+
+    def reproduction_tick(self):
+        """Reproducer attempts to spawn one unit per second (if base has food, pop cap not reached)."""
+        pops = self.units.pop
+        for t in range(C.NUM_TEAMS):
+            if pops[t] >= C.MAX_TEAM_POP: continue
+            home = self.home_of(t)
+            if not home: continue
+            if self.tick % C.FPS != 0: continue   # ~1Hz
+            if home.stock_food < C.REPRODUCE_FOOD_COST: continue
+
+            weights = C.ROLE_WEIGHTS[t]  # [scav, builder, defender, attacker]
+            role  = self.rng.choices(ROLES, weights=weights, k=1)[0]
+            home.stock_food -= C.REPRODUCE_FOOD_COST
+            self.units.append(Unit(home.x, home.y, t, role, home))
+
+    def update_buildings(self):
+        for b in list(self.buildings):
+            b.update(self.units, self.buildings, self.foods)
+
+    def update_units(self):
+        units = self.units
+        alive=[]
+        for u in units:
+            if u.update(self.foods, self.resources, self.buildings, units):
+                alive.append(u)
+            units.moved(u)
+        units.replace(alive)
+
+    # ----------------- one tick -----------------
+    def step(self):
+        """Advance the simulation by one tick. Returns True when this tick ended a round
+           (result in last_winner / last_round_ticks; the world has already restarted)."""
+        prof = self.prof
+        self.tick += 1
+        self.spawn_food_and_resources()
+        if prof: prof.mark("spawn")
+
+        # buildings update
+        self.update_buildings()
+        if prof: prof.mark("buildings")
+
+        self.ensure_reproducer_exists()
+        self.reproduction_tick()
+        if prof: prof.mark("reproduce")
+
+        # units update (remove dead)
+        self.update_units()
+        if self.pheromones is not None: self.pheromones.step()
+        if prof: prof.mark("units")
+
+        # attacks declared this tick, settled together (combat.py)
+        if self.combat is not None:
+            self.combat.resolve(self.units, self.buildings)
+            if prof: prof.mark("combat")
+
+        # round end / restart logic
+        sr = self.survivors_nonrepro_count()
+        alive_teams = [i for i,c in enumerate(sr) if c>0]
+        if len(alive_teams) == 1:
+            winner = alive_teams[0]
+        elif len(alive_teams) == 0 and self.tick > C.FPS*8:
+            winner = None
+        elif self.tick >= C.ROUND_MAX_TICKS:
+            winner = timeout_winner(sr)
+        else:
+            if prof: prof.mark("round_end")
+            return False
+        self.last_winner, self.last_round_ticks = winner, self.tick
+        self.end_round_and_restart(winner)
+        if prof: prof.mark("round_end")
+        return True
+
+def new_world(**kw):
+    """World flavour picked by config: object units, or numpy struct-of-arrays (swarm.py)."""
+    if C.SOA_UNITS:
+        from swarm import SwarmWorld
+        return SwarmWorld(**kw)
+    return World(**kw)